@@ -0,0 +1,160 @@
+import re
+import threading
+from collections import OrderedDict
+from logging import getLogger
+
+try:
+    from Crypto.Hash import keccak as _pycryptodome_keccak
+except ImportError:  # Optional: the pure Python Keccak below gives the same digest, only slower
+    _pycryptodome_keccak = None
+
+
+# Initialize logger
+logger = getLogger(__name__)
+
+ADDRESS_PATTERN = re.compile(r'^0x[0-9a-fA-F]{40}$')
+
+# Marks cached rejections, so repeated junk is turned away without re-validating it
+_INVALID = object()
+
+
+def _round_constant_bit(t):
+    r = 1
+    for _ in range(t % 255):
+        r <<= 1
+        if r & 0x100:
+            r ^= 0x171
+    return r & 1
+
+
+_MASK = (1 << 64) - 1
+_ROUND_CONSTANTS = [sum(_round_constant_bit(j + 7 * rnd) << ((1 << j) - 1) for j in range(7)) for rnd in range(24)]
+_ROTATIONS = [0] * 25
+_x, _y = 1, 0
+for _t in range(24):
+    _ROTATIONS[_x + 5 * _y] = ((_t + 1) * (_t + 2) // 2) % 64
+    _x, _y = _y, (2 * _x + 3 * _y) % 5
+del _x, _y, _t
+
+
+def _rotate(lane, n):
+    return ((lane << n) | (lane >> (64 - n))) & _MASK if n else lane
+
+
+def _keccak_f(a):
+    for rc in _ROUND_CONSTANTS:
+        c = [a[x] ^ a[x + 5] ^ a[x + 10] ^ a[x + 15] ^ a[x + 20] for x in range(5)]
+        d = [c[(x - 1) % 5] ^ _rotate(c[(x + 1) % 5], 1) for x in range(5)]
+        b = [0] * 25
+        for x in range(5):
+            for y in range(5):
+                b[y + 5 * ((2 * x + 3 * y) % 5)] = _rotate(a[x + 5 * y] ^ d[x], _ROTATIONS[x + 5 * y])
+        for y in range(0, 25, 5):
+            row = b[y:y + 5]
+            for x in range(5):
+                a[y + x] = row[x] ^ (~row[(x + 1) % 5] & row[(x + 2) % 5] & _MASK)
+        a[0] ^= rc
+
+
+def keccak256(data):
+    """Ethereum's Keccak-256 (the original padding, not NIST SHA3-256)."""
+    if _pycryptodome_keccak is not None:
+        return _pycryptodome_keccak.new(digest_bits=256, data=data).digest()
+
+    rate = 136
+    padded = bytearray(data) + b'\x01' + bytes(-(len(data) + 1) % rate)
+    padded[-1] |= 0x80
+    state = [0] * 25
+    for offset in range(0, len(padded), rate):
+        for i in range(rate // 8):
+            state[i] ^= int.from_bytes(padded[offset + 8 * i:offset + 8 * i + 8], 'little')
+        _keccak_f(state)
+    return b''.join(lane.to_bytes(8, 'little') for lane in state[:4])
+
+
+def to_checksum_address(address):
+    """EIP-55 mixed-case form of a 0x-prefixed hex address."""
+    hex_address = address[2:].lower()
+    digest = keccak256(hex_address.encode('ascii')).hex()
+    return '0x' + ''.join(char.upper() if int(nibble, 16) >= 8 else char
+                          for char, nibble in zip(hex_address, digest))
+
+
+class AddressCanonicalizer:
+    """Validates wallet addresses and maps them to the lowercase form stored in player rows.
+
+    `0xABC…` and `0xabc…` are the same wallet, so every address coming from a
+    client goes through canonical() before it is used as a key. Mixed-case input
+    is an EIP-55 checksum and, with ETHEREUM_VERIFY_CHECKSUM (default on), must
+    match; all-lowercase or all-uppercase input carries no checksum. Results,
+    rejections included, are kept in a bounded LRU since the Keccak hash is the
+    expensive part and a join burst repeats the same addresses.
+    """
+
+    def __init__(self, verify_checksum=True, max_entries=100000):
+        self.verify_checksum = verify_checksum
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        app.extensions['ethereum_addresses'] = self
+        self.verify_checksum = bool(app.config.get('ETHEREUM_VERIFY_CHECKSUM', True))
+        self.clear()
+
+    def canonical(self, address):
+        """Lowercase 0x address, or None when `address` is not a valid Ethereum address."""
+        if not isinstance(address, str):
+            return None
+        with self._lock:
+            result = self._entries.get(address)
+            if result is not None:
+                self._entries.move_to_end(address)
+        if result is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            result = self._validate(address)
+            with self._lock:
+                self._entries[address] = result
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        if result is _INVALID:
+            self.rejected += 1
+            return None
+        return result
+
+    def _validate(self, address):
+        address = address.strip()
+        if not ADDRESS_PATTERN.match(address):
+            return _INVALID
+        digits = address[2:]
+        if self.verify_checksum and digits != digits.lower() and digits != digits.upper():
+            if to_checksum_address(address) != address:
+                return _INVALID
+        return '0x' + digits.lower()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def collect(self):
+        """Prometheus exposition lines for metrics.add_collector."""
+        return [
+            '# HELP wtw_address_cache_requests_total Ethereum address canonicalizations by cache result.',
+            '# TYPE wtw_address_cache_requests_total counter',
+            f'wtw_address_cache_requests_total{{result="hit"}} {self.hits}',
+            f'wtw_address_cache_requests_total{{result="miss"}} {self.misses}',
+            '# HELP wtw_address_rejected_total Addresses rejected as malformed or with a bad checksum.',
+            '# TYPE wtw_address_rejected_total counter',
+            f'wtw_address_rejected_total {self.rejected}',
+            '# HELP wtw_address_cache_entries Canonicalized addresses currently cached.',
+            '# TYPE wtw_address_cache_entries gauge',
+            f'wtw_address_cache_entries {len(self._entries)}',
+        ]
+
+
+ethereum_addresses = AddressCanonicalizer()
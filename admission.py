@@ -0,0 +1,217 @@
+import datetime
+import threading
+from collections import OrderedDict, namedtuple
+from logging import getLogger
+
+from flask import abort
+from sqlalchemy import func, literal, select
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db, socketio
+from models import Game, Player
+
+
+# Initialize logger
+logger = getLogger(__name__)
+
+JOINED = 'joined'
+ALREADY_JOINED = 'already_joined'
+FULL = 'full'
+CLOSED = 'closed'
+
+JoinResult = namedtuple('JoinResult', ['status', 'player_count', 'joined_at'])
+
+
+class GameSeats:
+    """In-memory seat map for one game: who holds a seat and how many are left."""
+
+    def __init__(self, game_id, capacity, start_time, addresses):
+        self.game_id = game_id
+        self.capacity = capacity
+        self.start_time = start_time
+        self.addresses = set(addresses)
+        self.pending = set()  # Seats handed out whose INSERT has not committed yet
+        self.lock = threading.Lock()
+
+    @property
+    def count(self):
+        return len(self.addresses)
+
+    def is_full(self):
+        return self.count >= self.capacity
+
+
+class GameAdmission:
+    """Atomic lobby joins with per-game seat counters held in memory.
+
+    A seat is taken under the game's lock before the player row is written, so
+    concurrent joins get distinct, correct player counts and a full game is
+    rejected without a database round trip. The INSERT itself runs with the
+    game row locked (SELECT ... FOR UPDATE) and only succeeds while the game
+    still has room and the wallet is not already in it, so other workers (whose
+    counters this process can't see) can't overbook it either, even under READ
+    COMMITTED; whenever the database disagrees the game's counter is reloaded.
+    """
+
+    def __init__(self, max_games=1000, reconcile_interval=60):
+        self.app = None
+        self.max_games = max_games
+        self.reconcile_interval = reconcile_interval
+        self.joins = 0
+        self.rejected_full = 0
+        self.conflicts = 0
+        self._games = OrderedDict()
+        self._lock = threading.Lock()
+        self._running = False
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['game_admission'] = self
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            socketio.start_background_task(self._run)
+
+    def seats(self, game_id):
+        with self._lock:
+            seats = self._games.get(game_id)
+            if seats is not None:
+                self._games.move_to_end(game_id)
+                return seats
+
+        seats = self._load(game_id)
+        if seats is None:
+            abort(404)
+        with self._lock:
+            seats = self._games.setdefault(game_id, seats)
+            while len(self._games) > self.max_games:
+                self._games.popitem(last=False)
+        return seats
+
+    def _load(self, game_id):
+        game = db.session.query(Game.max_players, Game.start_time, Game.has_started, Game.is_complete).filter(
+            Game.id == game_id).first()
+        if game is None:
+            return None
+        addresses = [address for (address,) in
+                     db.session.query(Player.ethereum_address).filter(Player.game_id == game_id)]
+        # A started or finished game admits nobody, whatever its start_time says
+        start_time = game.start_time
+        if game.has_started or game.is_complete:
+            start_time = datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+        return GameSeats(game_id, game.max_players, start_time, addresses)
+
+    def join(self, game_id, ethereum_address):
+        """Give a wallet a seat in a game and write its player row. Returns a JoinResult."""
+        seats = self.seats(game_id)
+        with seats.lock:
+            # A player who already holds a seat keeps it after the game starts
+            if ethereum_address in seats.addresses:
+                return JoinResult(ALREADY_JOINED, seats.count, None)
+            if datetime.datetime.now(datetime.timezone.utc) >= seats.start_time:
+                return JoinResult(CLOSED, seats.count, None)
+            if seats.is_full():
+                self.rejected_full += 1
+                return JoinResult(FULL, seats.count, None)
+            seats.addresses.add(ethereum_address)
+            seats.pending.add(ethereum_address)
+            player_count = seats.count
+
+        try:
+            joined_at = self._insert_player(game_id, ethereum_address, seats.capacity)
+        except Exception:
+            db.session.rollback()
+            with seats.lock:
+                seats.addresses.discard(ethereum_address)
+            raise
+        finally:
+            with seats.lock:
+                seats.pending.discard(ethereum_address)
+
+        if joined_at is None:
+            # Another worker took the seat or already added this wallet: trust the database
+            self.conflicts += 1
+            seats = self.reconcile(game_id)
+            if ethereum_address in seats.addresses:
+                return JoinResult(ALREADY_JOINED, seats.count, None)
+            self.rejected_full += 1
+            return JoinResult(FULL, seats.count, None)
+
+        self.joins += 1
+        return JoinResult(JOINED, player_count, joined_at)
+
+    def _insert_player(self, game_id, ethereum_address, capacity):
+        """INSERT the player only if the game has room; returns joined_at, or None if nothing was written."""
+        joined_at = datetime.datetime.now(datetime.timezone.utc)
+        dialect = db.engine.dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            insert = None
+
+        # Joins to one game queue on its row, so the count below can't be stale when the
+        # INSERT runs (a no-op on SQLite, which already serializes writers)
+        db.session.execute(select(Game.id).where(Game.id == game_id).with_for_update())
+        player = Player.__table__
+
+        if insert is None:
+            taken = db.session.execute(select(func.count(player.c.id)).where(player.c.game_id == game_id)).scalar()
+            if taken >= capacity:
+                db.session.rollback()
+                return None
+            try:
+                db.session.add(Player(game_id=game_id, ethereum_address=ethereum_address, joined_at=joined_at))
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                return None
+            return joined_at
+
+        seats_taken = select(func.count(player.c.id)).where(player.c.game_id == game_id).scalar_subquery()
+        stmt = insert(player).from_select(
+            ['game_id', 'ethereum_address', 'score', 'joined_at'],
+            select(literal(game_id), literal(ethereum_address), literal(0), literal(joined_at, Player.joined_at.type))
+            .where(seats_taken < capacity)
+        ).on_conflict_do_nothing(index_elements=['game_id', 'ethereum_address'])
+        result = db.session.execute(stmt)
+        db.session.commit()
+        return joined_at if result.rowcount else None
+
+    def reconcile(self, game_id):
+        """Reload a game's seats from the database, keeping seats still being written."""
+        fresh = self._load(game_id)
+        if fresh is None:
+            self.evict(game_id)
+            abort(404)
+        with self._lock:
+            seats = self._games.get(game_id)
+            if seats is None:
+                self._games[game_id] = fresh
+                return fresh
+        with seats.lock:
+            seats.capacity = fresh.capacity
+            seats.start_time = fresh.start_time
+            seats.addresses = fresh.addresses | seats.pending
+        return seats
+
+    def evict(self, game_id):
+        """Forget a game's seats, e.g. after it was re-timed, started or ended."""
+        with self._lock:
+            self._games.pop(game_id, None)
+
+    def _run(self):
+        while True:
+            socketio.sleep(self.reconcile_interval)
+            with self.app.app_context():
+                for game_id in list(self._games):
+                    try:
+                        self.reconcile(game_id)
+                    except Exception as e:
+                        logger.error(f"Error reconciling seats for game ID {game_id}: {e}")
+                        db.session.rollback()
+
+
+game_admission = GameAdmission()
@@ -0,0 +1,136 @@
+import operator
+import re
+import threading
+import unicodedata
+from collections import OrderedDict, namedtuple
+from itertools import chain
+from logging import getLogger
+
+try:
+    import numpy
+except ImportError:  # Optional: the pure Python path computes the same result
+    numpy = None
+
+from extensions import db
+from models import Game
+from question_bank import question_bank
+
+
+# Initialize logger
+logger = getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+
+# Token ids in the scoring matrix; answers in the key are numbered from 1
+OTHER, BLANK, MISSING = 0, -1, -2
+
+# Below this many submissions building NumPy arrays costs more than it saves
+NUMPY_MIN_BATCH = 64
+
+# scores: one per submission, in order; correct / answered: one count per question
+BatchScores = namedtuple('BatchScores', ['scores', 'correct', 'answered'])
+
+
+def normalize_answer(text, nfkc=True):
+    """Canonical form used for every answer comparison: NFKC, casefold, collapsed whitespace."""
+    if text is None:
+        return ''
+    if nfkc:
+        text = unicodedata.normalize('NFKC', text)
+    return _WHITESPACE.sub(' ', text.casefold()).strip()
+
+
+def score_answers(answer_key, submitted_answers, nfkc=True):
+    """Count the submitted answers matching the pre-normalized answer key, position by position."""
+    return score_batch(answer_key, [submitted_answers], nfkc).scores[0]
+
+
+def score_batch(answer_key, submissions, nfkc=True, use_numpy=None):
+    """Score every submission against one pre-normalized answer key in a single columnar pass.
+
+    Each distinct raw answer is normalized once per batch and mapped to a token
+    id (the key's answer for that text, OTHER, BLANK, or MISSING past the end of
+    a short submission), so the comparison is integer equality over a players x
+    questions matrix: one vectorized compare with NumPy, C-level counts without.
+    """
+    width = len(answer_key)
+    vocabulary = {}
+    key_ids = [vocabulary.setdefault(answer, len(vocabulary) + 1) for answer in answer_key]
+    if not submissions or not width:
+        return BatchScores([0] * len(submissions), [0] * width, [0] * width)
+
+    # Normalize each distinct answer once, then every cell is a dict lookup in C
+    tokens = {}
+    for raw in set(chain.from_iterable(submissions)):
+        normalized = normalize_answer(raw, nfkc)
+        tokens[raw] = vocabulary.get(normalized, OTHER if normalized else BLANK)
+
+    rows = []
+    for submitted in submissions:
+        row = list(map(tokens.__getitem__, submitted[:width]))
+        if len(row) < width:
+            row.extend([MISSING] * (width - len(row)))
+        rows.append(row)
+
+    if use_numpy is None:
+        use_numpy = len(rows) >= NUMPY_MIN_BATCH
+    if use_numpy and numpy is not None:
+        matrix = numpy.array(rows, dtype=numpy.int32)
+        hits = matrix == numpy.array(key_ids, dtype=numpy.int32)
+        return BatchScores(hits.sum(axis=1).tolist(), hits.sum(axis=0).tolist(),
+                           (matrix >= OTHER).sum(axis=0).tolist())
+
+    scores = [sum(map(operator.eq, row, key_ids)) for row in rows]
+    columns = list(zip(*rows))
+    correct = [column.count(key_id) for key_id, column in zip(key_ids, columns)]
+    answered = [len(column) - column.count(BLANK) - column.count(MISSING) for column in columns]
+    return BatchScores(scores, correct, answered)
+
+
+class AnswerKeyCache:
+    """Per-game tuples of pre-normalized answers, so scoring never has to hit the DB.
+
+    Keys are primed when a game is created (or loaded on first use) and evicted
+    once the game completes. Games that share a question set share one key.
+    """
+
+    def __init__(self, nfkc=True, max_sets=5000):
+        self.nfkc = nfkc
+        self.max_sets = max_sets
+        self._keys = {}
+        self._set_keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    def prime(self, game_id, questions, question_set_id=None):
+        answer_key = self._set_keys.get(question_set_id) if question_set_id is not None else None
+        if answer_key is None:
+            answer_key = tuple(normalize_answer(q.answer, self.nfkc) for q in questions)
+        with self._lock:
+            if question_set_id is not None:
+                answer_key = self._set_keys.setdefault(question_set_id, answer_key)
+                while len(self._set_keys) > self.max_sets:
+                    self._set_keys.popitem(last=False)
+            self._keys[game_id] = answer_key
+        return answer_key
+
+    def get(self, game_id):
+        answer_key = self._keys.get(game_id)
+        if answer_key is None:
+            game = db.session.get(Game, game_id)
+            if game is None:
+                return ()
+            answer_key = self.prime(game_id, question_bank.for_game(game), game.question_set_id)
+        return answer_key
+
+    def evict(self, game_id):
+        with self._lock:
+            self._keys.pop(game_id, None)
+
+    def score(self, game_id, submitted_answers):
+        return score_answers(self.get(game_id), submitted_answers, self.nfkc)
+
+    def score_batch(self, game_id, submissions):
+        return score_batch(self.get(game_id), submissions, self.nfkc)
+
+
+answer_keys = AnswerKeyCache()
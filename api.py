@@ -0,0 +1,171 @@
+import datetime
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from logging import getLogger
+
+from flask import Blueprint, current_app, jsonify, request
+
+from sqlalchemy import func
+
+from extensions import db
+from models import Game, Player
+from question_bank import question_bank
+from versions import game_versions
+
+
+# Initialize logger
+logger = getLogger(__name__)
+
+CachedResponse = namedtuple('CachedResponse', ['version', 'body', 'etag', 'data', 'expires'])
+
+
+class ApiResponseCache:
+    """Serialized JSON bodies keyed by resource, reused until the game version changes.
+
+    Each entry is serialized once per version and carries a content-hash ETag,
+    so unchanged data is answered with 304 Not Modified without touching the
+    ORM. The TTL bounds staleness for changes made by other worker processes.
+    """
+
+    def __init__(self, max_entries=5000, ttl=5):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version, loader):
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry.version == version and entry.expires > now:
+            return entry
+
+        data = loader()
+        if data is None:
+            return None
+        body = json.dumps(data, separators=(',', ':'), sort_keys=True).encode('utf-8')
+        entry = CachedResponse(version, body, hashlib.sha1(body).hexdigest(), data, now + self.ttl)
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+
+api_cache = ApiResponseCache()
+
+
+def _isoformat(dt):
+    return dt.isoformat() if dt else None
+
+
+def _player_to_dict(player):
+    return {'id': player.id, 'ethereum_address': player.ethereum_address, 'score': player.score}
+
+
+def _game_to_dict(game, player_count):
+    return {
+        'id': game.id,
+        'time_limit': game.time_limit,
+        'max_players': game.max_players,
+        'pot_size': game.pot_size,
+        'entry_value': game.entry_value,
+        'start_time': _isoformat(game.start_time),
+        'end_time': _isoformat(game.end_time),
+        'has_started': bool(game.has_started),
+        'is_complete': bool(game.is_complete),
+        'player_count': player_count,
+    }
+
+
+def _load_game(game_id):
+    game = db.session.get(Game, game_id)
+    if game is None:
+        return None
+    players = Player.query.filter_by(game_id=game_id).order_by(Player.joined_at, Player.id).all()
+    data = _game_to_dict(game, len(players))
+    data['players'] = [_player_to_dict(player) for player in players]
+    return data
+
+
+def _load_games():
+    games = Game.query.filter_by(is_complete=False).order_by(Game.start_time).all()
+    player_counts = dict(
+        db.session.query(Player.game_id, func.count(Player.id))
+        .filter(Player.game_id.in_([game.id for game in games]))
+        .group_by(Player.game_id)
+        .all()
+    ) if games else {}
+    return [_game_to_dict(game, player_counts.get(game.id, 0)) for game in games]
+
+
+def _load_players(game_id):
+    if db.session.get(Game, game_id) is None:
+        return None
+    players = Player.query.filter_by(game_id=game_id).order_by(Player.score.desc(), Player.joined_at).all()
+    return [_player_to_dict(player) for player in players]
+
+
+def _load_questions(game_id):
+    game = db.session.get(Game, game_id)
+    if game is None:
+        return None
+    questions = question_bank.for_game(game)
+    # Phrases only; answers never leave the server
+    return [{'id': question.id, 'phrase': question.phrase} for question in questions]
+
+
+def _respond(entry, max_age):
+    response = current_app.response_class(entry.body, mimetype='application/json')
+    response.set_etag(entry.etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    return response.make_conditional(request)
+
+
+def _not_found():
+    return jsonify({'success': False, 'message': 'Game not found.'}), 404
+
+
+# Blueprint creation for the read-only JSON API used by the mobile client
+def create_api():
+    api = Blueprint('api', __name__, url_prefix='/api')
+
+    @api.route('/games')
+    def list_games():
+        entry = api_cache.get(('games',), game_versions.current, _load_games)
+        return _respond(entry, max_age=2)
+
+    @api.route('/games/<int:game_id>')
+    def get_game(game_id):
+        entry = api_cache.get(('game', game_id), game_versions.game(game_id), lambda: _load_game(game_id))
+        if entry is None:
+            return _not_found()
+        return _respond(entry, max_age=2)
+
+    @api.route('/games/<int:game_id>/players')
+    def get_players(game_id):
+        entry = api_cache.get(('players', game_id), game_versions.game(game_id), lambda: _load_players(game_id))
+        if entry is None:
+            return _not_found()
+        return _respond(entry, max_age=2)
+
+    @api.route('/games/<int:game_id>/questions')
+    def get_questions(game_id):
+        game = api_cache.get(('game', game_id), game_versions.game(game_id), lambda: _load_game(game_id))
+        if game is None:
+            return _not_found()
+
+        # Same rule as the play page: phrases are only revealed once the game has started
+        start_time = datetime.datetime.fromisoformat(game.data['start_time'])
+        if start_time > datetime.datetime.now(datetime.timezone.utc):
+            return jsonify({'success': False, 'message': 'The game has not started yet.'}), 403
+
+        entry = api_cache.get(('questions', game_id), game_versions.game(game_id), lambda: _load_questions(game_id))
+        return _respond(entry, max_age=60)
+
+    return api
@@ -1,127 +1,178 @@
 import os
 import logging
+import threading
 from logging.handlers import RotatingFileHandler
-import traceback
 from datetime import datetime, timezone
 
-import eventlet
-eventlet.monkey_patch()
+if __name__ == '__main__':
+    # Serving: green every blocking call before anything else is imported
+    import eventlet
+    eventlet.monkey_patch()
 
-from flask import Flask, render_template, redirect, url_for, flash, request, jsonify
+from flask import Flask
 from flask_migrate import Migrate
 from flask_cors import CORS
 
 from extensions import db, socketio
+from database import configure_database, init_engine, pool_metrics
+from metrics import metrics
+from message_queue import socketio_options
 from routes import create_routes
-from forms import CreateGameForm
-from models import Game
-
-from utils import make_aware  # Correctly imported for timezone-aware functionality
-
-
-# Create the Flask application
-app = Flask(__name__)
-
-# CORS configuration
-CORS(app, resources={r"/*": {
-    "origins": [
-        "https://replit.com",
-        "https://replit.com/@shegemsanad/WTW2-Game-Server",
-        "https://15e5978f-2efe-40e8-8c8c-6bf6cd37298e-00-287zvg5sagp5p.sisko.replit.dev"
-    ],
-    "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    "allow_headers": ["Content-Type", "Authorization", "X-Requested-With"]
-}}, supports_credentials=True)
-
-app.secret_key = "07e7d9d6-f9e5-4f4a-9d2d-b3f"
-app.config["SECRET_KEY"] = app.secret_key
-app.config['PREFERRED_URL_SCHEME'] = 'https'
-app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///test.db")
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-app.config['WTF_CSRF_ENABLED'] = False
-
-
-# Database configuration
-database_url = os.environ.get("DATABASE_URL", "sqlite:///test.db")
-app.config["SQLALCHEMY_DATABASE_URI"] = database_url
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-
-db.init_app(app)
-migrate = Migrate(app, db)
-CORS(app, resources={r"/*": {"origins": ["https://replit.com", "https://replit.com/@shegemsanad/WTW2-Game-Server"]}}, supports_credentials=True)
-socketio.init_app(app, async_mode='eventlet')
-
-# Other configurations
-app.config['WTF_CSRF_ENABLED'] = False
-socketio.init_app(app, async_mode='eventlet')
-
-# Create and register blueprints
-main, admin = create_routes()
-app.register_blueprint(main)
-app.register_blueprint(admin, url_prefix='/admin')
-
-# Create database tables
-with app.app_context():
-    db.create_all()
-
-# Set up logging
-if not app.debug:
-    handler = RotatingFileHandler('error.log', maxBytes=10000, backupCount=1)
-    handler.setLevel(logging.INFO)
-    app.logger.addHandler(handler)
-
-
-@app.context_processor
-def inject_utils():
-    return dict(now=datetime.now(timezone.utc), make_aware=make_aware)
-
-# Routes
-@app.route('/admin/dashboard')
-def admin_dashboard():
-    games = Game.query.order_by(Game.created_at.desc()).all()
-    for game in games:
-        game.start_time = make_aware(game.start_time)
-    return render_template('admin/dashboard.html', games=games)
-
-@app.route('/admin/create_game', methods=['GET', 'POST'])
-def create_game():
-    form = CreateGameForm()
-    if request.method == 'POST':
-            app.logger.info(f"Received POST request: {request.form}")
-            if form.validate_on_submit():
-                try:
-                    game = Game(
-                        time_limit=form.time_limit.data,
-                        max_players=form.max_players.data,
-                        pot_size=form.pot_size.data,
-                        entry_value=form.entry_value.data,
-                        start_time=make_aware(form.start_time.data)
-                    )
-                    db.session.add(game)
-                    db.session.flush()  # This will assign an ID to the game
-
-                    # Add questions
-                    for i in range(12):  # Assuming 12 questions
-                        phrase = getattr(form, f'phrase_{i}').data
-                        answer = getattr(form, f'answer_{i}').data
-                        if phrase and answer:
-                            question = Question(game_id=game.id, phrase=phrase, answer=answer)
-                            db.session.add(question)
-
-                    db.session.commit()
-
-                    app.logger.info(f"Game created successfully: {game.id}")
-                    return jsonify({'success': True, 'message': 'Game created successfully!'}), 200
-                except Exception as e:
-                    db.session.rollback()
-                    app.logger.error(f"Error creating game: {str(e)}")
-                    app.logger.error(traceback.format_exc())
-                    return jsonify({'success': False, 'message': f'Failed to create game: {str(e)}'}), 500
-            else:
-                app.logger.warning(f"Form validation failed: {form.errors}")
-                return jsonify({'success': False, 'errors': form.errors}), 400
-    return render_template('admin/create_game.html', form=form)
+from api import create_api
+from lifecycle import game_scheduler
+from stats import game_statistics
+from submissions import submission_queue
+from admission import game_admission
+import importer
+import exports
+from archive import game_archiver
+from fragments import fragment_cache
+from ratelimit import rate_limiter
+from addresses import ethereum_addresses
+
+
+def env_flag(value):
+    return value.lower() not in ('0', 'false', 'no', 'off')
+
+
+# Settings copied from the environment when set: (config key, type)
+ENV_SETTINGS = (
+    # Socket.IO message queue shared by all workers (see message_queue.socketio_options)
+    ('SOCKETIO_MESSAGE_QUEUE', str),
+    ('SOCKETIO_CHANNEL', str),
+    ('SOCKETIO_TRANSPORTS', str),
+    ('SOCKETIO_COOKIE', str),
+    # Log requests slower than this many milliseconds with their SQL statements
+    ('SLOW_REQUEST_MS', float),
+    # Submissions that still fail to write after every retry are appended here (JSON lines)
+    ('SUBMISSION_DEAD_LETTER', str),
+    # Completed games older than this many days move to the archive tables (0 disables the job)
+    ('ARCHIVE_AFTER_DAYS', int),
+    # Join / submit rate limits (see ratelimit.RateLimiter): memory:// or redis:// buckets
+    ('RATE_LIMIT_ENABLED', env_flag),
+    ('RATE_LIMIT_STORAGE', str),
+    ('RATE_LIMIT_PROXY_COUNT', int),
+    # Reject mixed-case wallet addresses whose EIP-55 checksum does not match
+    ('ETHEREUM_VERIFY_CHECKSUM', env_flag),
+)
+
+# Periodic jobs, started once per serving process by start_background_tasks
+BACKGROUND_SERVICES = (
+    game_scheduler,     # Starts and completes games when due
+    game_statistics,    # Reconciles the in-memory homepage statistics against the DB
+    submission_queue,   # Writes buffered answer submissions in bulk
+    game_admission,     # Reconciles the in-memory lobby seat counts against the DB
+    game_archiver,      # Moves old completed games to the archive tables
+    metrics,            # Samples event loop lag for /metrics
+)
+
+_background_lock = threading.Lock()
+
+
+def create_app(config=None):
+    """Build and configure the Flask application; `config` overrides any setting.
+
+    DATABASE_URL and DATABASE_PROFILE may be passed in `config` instead of the
+    environment, e.g. create_app({'DATABASE_URL': 'sqlite://', 'TESTING': True}).
+
+    Only configuration, extensions, blueprints and CLI commands are set up here,
+    so importing this module or running a `flask` CLI command stays cheap. The
+    schema is owned by the migrations (`flask db upgrade`), and background jobs
+    start with start_background_tasks when the app actually serves traffic.
+    """
+    app = Flask(__name__)
+
+    # CORS configuration
+    CORS(app, resources={r"/*": {
+        "origins": [
+            "https://replit.com",
+            "https://replit.com/@shegemsanad/WTW2-Game-Server",
+            "https://15e5978f-2efe-40e8-8c8c-6bf6cd37298e-00-287zvg5sagp5p.sisko.replit.dev"
+        ],
+        "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+        "allow_headers": ["Content-Type", "Authorization", "X-Requested-With"]
+    }}, supports_credentials=True)
+
+    app.secret_key = "07e7d9d6-f9e5-4f4a-9d2d-b3f"
+    app.config["SECRET_KEY"] = app.secret_key
+    app.config['PREFERRED_URL_SCHEME'] = 'https'
+    app.config['WTF_CSRF_ENABLED'] = False
+
+    for key, cast in ENV_SETTINGS:
+        if os.environ.get(key):
+            app.config[key] = cast(os.environ[key])
+    app.config.update(config or {})
+
+    # Database configuration: DATABASE_URL plus a named engine profile (see database.PROFILES)
+    configure_database(app)
+
+    db.init_app(app)
+    init_engine(app)
+    Migrate(app, db)
+    socketio.init_app(app, **socketio_options(app.config))
+
+    # Request, SQL, Socket.IO and event loop metrics on /metrics
+    metrics.init_app(app)
+    metrics.add_collector(pool_metrics.collect)
+    metrics.add_collector(fragment_cache.collect)
+
+    # Token-bucket limits on lobby joins, answer submissions and socket joins
+    rate_limiter.init_app(app)
+    metrics.add_collector(rate_limiter.collect)
+
+    # Wallet addresses are validated and lowercased once, then served from an LRU
+    ethereum_addresses.init_app(app)
+    metrics.add_collector(ethereum_addresses.collect)
+
+    # Create and register blueprints
+    main, admin = create_routes()
+    app.register_blueprint(main)
+    app.register_blueprint(admin, url_prefix='/admin')
+    app.register_blueprint(create_api())
+
+    # `flask import-games` and `flask export-games` CLI commands
+    importer.init_app(app)
+    exports.init_app(app)
+
+    # Background subsystems; their jobs start in start_background_tasks
+    game_scheduler.init_app(app)
+    game_statistics.init_app(app)
+    submission_queue.init_app(app)  # Also registers `flask replay-submissions`
+    game_admission.init_app(app)
+    game_archiver.init_app(app)  # Also registers `flask archive-games`
+
+    # A worker started by a WSGI server rather than `python app.py` starts its jobs on the first request
+    @app.before_request
+    def ensure_background_tasks():
+        start_background_tasks(app)
+
+    # Set up logging
+    if not app.debug:
+        handler = RotatingFileHandler('error.log', maxBytes=10000, backupCount=1)
+        handler.setLevel(logging.INFO)
+        app.logger.addHandler(handler)
+
+    @app.context_processor
+    def inject_utils():
+        return dict(now=datetime.now(timezone.utc))
+
+    return app
+
+
+def start_background_tasks(app):
+    """Start every periodic job once per process. Call before serving traffic."""
+    if app.extensions.get('background_tasks_started'):
+        return
+    with _background_lock:
+        if app.extensions.get('background_tasks_started'):
+            return
+        for service in BACKGROUND_SERVICES:
+            service.start()
+        app.extensions['background_tasks_started'] = True
+
 
 # Run the app
 if __name__ == '__main__':
+    app = create_app()
+    start_background_tasks(app)
     socketio.run(app, host='0.0.0.0', port=5000)
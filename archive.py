@@ -0,0 +1,200 @@
+import datetime
+import json
+import zlib
+from collections import namedtuple
+from logging import getLogger
+
+import click
+from sqlalchemy import func, or_
+
+from answers import answer_keys
+from admission import game_admission
+from extensions import db, socketio
+from leaderboard import leaderboards
+from models import ArchivedGame, ArchiveTotals, Game, Player, Question
+from stats import game_statistics
+from submissions import submission_queue
+from versions import game_versions
+
+
+# Initialize logger
+logger = getLogger(__name__)
+
+ArchivedPlayer = namedtuple('ArchivedPlayer', ['rank', 'ethereum_address', 'score', 'joined_at'])
+ArchivedQuestion = namedtuple('ArchivedQuestion', ['phrase', 'answer'])
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+def _parse(value):
+    return datetime.datetime.fromisoformat(value) if value is not None else None
+
+
+def encode_payload(players, questions):
+    """Compact blob of a game's ranked players and its own (non-shared) questions."""
+    data = {
+        'players': [[address, score, _isoformat(joined_at)] for address, score, joined_at in players],
+        'questions': [[phrase, answer] for phrase, answer in questions],
+    }
+    return zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'), 9)
+
+
+def decode_payload(payload):
+    """Inverse of encode_payload: (players, questions) as ArchivedPlayer / ArchivedQuestion lists."""
+    data = json.loads(zlib.decompress(payload).decode('utf-8'))
+    players = [ArchivedPlayer(rank, address, score, _parse(joined_at))
+               for rank, (address, score, joined_at) in enumerate(data['players'], start=1)]
+    questions = [ArchivedQuestion(phrase, answer) for phrase, answer in data['questions']]
+    return players, questions
+
+
+class GameArchiver:
+    """Moves completed games older than the retention window out of the hot tables.
+
+    Each batch copies games into `archived_game` (players and legacy questions
+    compressed into one blob), deletes their game / player / question rows and
+    adds them to the single `archive_totals` row, all in one transaction. The
+    listing, lifecycle and statistics queries then only ever see recent games,
+    while GameStatistics adds the archive totals back in.
+    """
+
+    def __init__(self, retention_days=30, batch_size=200, interval=3600):
+        self.app = None
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.interval = interval
+        self._running = False
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['game_archiver'] = self
+        self.retention_days = int(app.config.get('ARCHIVE_AFTER_DAYS', self.retention_days))
+
+        @app.cli.command('archive-games')
+        @click.option('--older-than-days', type=int, help='Defaults to ARCHIVE_AFTER_DAYS (30).')
+        @click.option('--batch-size', type=int, default=self.batch_size, show_default=True)
+        def archive_games_command(older_than_days, batch_size):
+            """Move completed games older than the retention window into the archive."""
+            archived = self.archive(older_than_days, batch_size)
+            click.echo(f"Archived {archived} games")
+
+    def start(self):
+        # Zero or negative retention disables the background job; the CLI still works
+        if self.retention_days > 0 and not self._running:
+            self._running = True
+            socketio.start_background_task(self._run)
+
+    def cutoff(self, retention_days=None):
+        days = self.retention_days if retention_days is None else retention_days
+        return datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days)
+
+    def archive(self, retention_days=None, batch_size=None):
+        """Archive every eligible game, one batch per transaction. Returns how many were archived."""
+        cutoff = self.cutoff(retention_days)
+        total = 0
+        while True:
+            archived = self.archive_batch(cutoff, batch_size or self.batch_size)
+            total += archived
+            if not archived:
+                break
+        if total:
+            logger.info(f"Archived {total} games completed before {cutoff.isoformat()}")
+        return total
+
+    def archive_batch(self, cutoff, batch_size):
+        games = Game.query.filter(
+            Game.is_complete.is_(True),
+            or_(Game.end_time < cutoff, (Game.end_time.is_(None) & (Game.start_time < cutoff)))
+        ).order_by(Game.id).limit(batch_size).all()
+        if not games:
+            return 0
+        game_ids = [game.id for game in games]
+
+        # Players in leaderboard order, so the first archived player is the winner
+        players = {game_id: [] for game_id in game_ids}
+        for game_id, address, score, joined_at in db.session.query(
+                Player.game_id, Player.ethereum_address, func.coalesce(Player.score, 0), Player.joined_at
+        ).filter(Player.game_id.in_(game_ids)).order_by(
+                Player.game_id, func.coalesce(Player.score, 0).desc(), Player.joined_at, Player.ethereum_address):
+            players[game_id].append((address, score, joined_at))
+
+        # Shared question sets stay where they are; only legacy per-game copies move
+        questions = {game_id: [] for game_id in game_ids}
+        for game_id, phrase, answer in db.session.query(Question.game_id, Question.phrase, Question.answer).filter(
+                Question.game_id.in_(game_ids)).order_by(Question.game_id, Question.id):
+            questions[game_id].append((phrase, answer))
+
+        archived_at = datetime.datetime.now(datetime.timezone.utc)
+        try:
+            for game in games:
+                ranked = players[game.id]
+                winner = ranked[0] if ranked else (None, None, None)
+                db.session.add(ArchivedGame(
+                    id=game.id, time_limit=game.time_limit, max_players=game.max_players,
+                    pot_size=game.pot_size, entry_value=game.entry_value, start_time=game.start_time,
+                    end_time=game.end_time, created_at=game.created_at, archived_at=archived_at,
+                    question_set_id=game.question_set_id, player_count=len(ranked),
+                    winner_address=winner[0], winner_score=winner[1],
+                    payload=encode_payload(ranked, questions[game.id])))
+            # A second worker archiving the same games fails on the archived_game primary key
+            db.session.flush()
+
+            # Increment in SQL so concurrent batches can't lose each other's totals; row 1
+            # is seeded with the table (migration e7b3d95a0c14 / models.seed_archive_totals)
+            updated = ArchiveTotals.query.filter_by(id=1).update({
+                ArchiveTotals.games: ArchiveTotals.games + len(games),
+                ArchiveTotals.rewards: ArchiveTotals.rewards + sum(game.pot_size or 0 for game in games),
+                ArchiveTotals.players: ArchiveTotals.players + sum(len(ranked) for ranked in players.values()),
+                ArchiveTotals.time: ArchiveTotals.time + sum(game.time_limit or 0 for game in games),
+            }, synchronize_session=False)
+            if not updated:
+                raise RuntimeError("archive_totals has no row 1; run `flask db upgrade`")
+
+            Player.query.filter(Player.game_id.in_(game_ids)).delete(synchronize_session=False)
+            Question.query.filter(Question.game_id.in_(game_ids)).delete(synchronize_session=False)
+            Game.query.filter(Game.id.in_(game_ids)).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        for game_id in game_ids:
+            leaderboards.evict(game_id)
+            answer_keys.evict(game_id)
+            game_admission.evict(game_id)
+            submission_queue.evict(game_id)
+        # Totals are unchanged, only where they are stored moved; re-read them once
+        game_statistics.reconcile()
+        game_versions.bump()
+        logger.info(f"Archived games {game_ids[0]}..{game_ids[-1]} ({len(game_ids)} games)")
+        return len(game_ids)
+
+    def get(self, game_id):
+        return db.session.get(ArchivedGame, game_id)
+
+    def page(self, before=None, limit=50):
+        """Newest archived games first, keyset-paginated on id; returns (games, next_before)."""
+        query = ArchivedGame.query.with_entities(
+            ArchivedGame.id, ArchivedGame.start_time, ArchivedGame.end_time, ArchivedGame.pot_size,
+            ArchivedGame.max_players, ArchivedGame.player_count, ArchivedGame.winner_address,
+            ArchivedGame.winner_score, ArchivedGame.archived_at)
+        if before is not None:
+            query = query.filter(ArchivedGame.id < before)
+        games = query.order_by(ArchivedGame.id.desc()).limit(limit + 1).all()
+        next_before = games[limit - 1].id if len(games) > limit else None
+        return games[:limit], next_before
+
+    def _run(self):
+        while True:
+            socketio.sleep(self.interval)
+            with self.app.app_context():
+                try:
+                    self.archive()
+                except Exception as e:
+                    logger.error(f"Error archiving games: {e}")
+                    db.session.rollback()
+
+
+game_archiver = GameArchiver()
@@ -0,0 +1,256 @@
+"""Route-level load test for the Flask / Socket.IO app.
+
+Boots `app` against a throwaway database, seeds games, players and questions,
+serves it from an in-process eventlet WSGI server and drives `/`,
+`/game/<id>/lobby`, `/game/<id>/submit` and `/admin/dashboard` with concurrent
+green HTTP clients, first one route at a time and then as a mixed workload.
+It also connects N Socket.IO test clients to one game room on `/game` and times
+the fan-out of room events.
+
+    python benchmarks/load_test.py --requests 2000 --concurrency 50 --socket-clients 200
+    python benchmarks/load_test.py --json run.json --compare previous.json
+
+Reports p50/p95/p99 latency, throughput and fan-out time; --json saves the
+report so runs can be compared with --compare.
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(latencies, errors, elapsed):
+    return {
+        'requests': len(latencies) + errors,
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+    }
+
+
+def seed(app, db, games, players_per_game, questions_per_game):
+    """Create upcoming lobby games plus one live game that accepts submissions."""
+    from models import Game, Player, Question
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    with app.app_context():
+        lobby_ids, addresses = [], []
+        for i in range(games):
+            game = Game(time_limit=600, max_players=100, pot_size=100.0, entry_value=1.0,
+                        start_time=now + datetime.timedelta(hours=1 + i),
+                        end_time=now + datetime.timedelta(hours=1 + i, seconds=600))
+            db.session.add(game)
+            db.session.flush()
+            lobby_ids.append(game.id)
+
+        live = Game(time_limit=3600, max_players=100, pot_size=100.0, entry_value=1.0,
+                    start_time=now - datetime.timedelta(seconds=5),
+                    end_time=now + datetime.timedelta(seconds=3600), has_started=True)
+        db.session.add(live)
+        db.session.flush()
+
+        for game_id in lobby_ids + [live.id]:
+            for q in range(questions_per_game):
+                db.session.add(Question(game_id=game_id, phrase=f'phrase {q}', answer=f'answer {q}'))
+            for p in range(players_per_game):
+                address = f'0x{game_id:020x}{p:020x}'
+                db.session.add(Player(game_id=game_id, ethereum_address=address))
+                if game_id == live.id:
+                    addresses.append(address)
+        db.session.commit()
+        return lobby_ids, live.id, addresses
+
+
+def start_server(app):
+    import eventlet
+    import eventlet.wsgi
+
+    sock = eventlet.listen(('127.0.0.1', 0))
+    eventlet.spawn(eventlet.wsgi.server, sock, app, log_output=False)
+    return 'http://127.0.0.1:%d' % sock.getsockname()[1]
+
+
+def build_scenarios(base_url, lobby_ids, live_id, addresses, questions_per_game):
+    rng = random.Random(7)
+
+    def index():
+        return base_url + '/', None
+
+    def lobby():
+        return f'{base_url}/game/{rng.choice(lobby_ids)}/lobby', None
+
+    def submit():
+        answers = [f'answer {q}' if rng.random() < 0.5 else 'wrong' for q in range(questions_per_game)]
+        body = urllib.parse.urlencode([('answers[]', a) for a in answers] +
+                                      [('ethereum_address', rng.choice(addresses))], doseq=True)
+        return f'{base_url}/game/{live_id}/submit', body.encode()
+
+    def dashboard():
+        return base_url + '/admin/dashboard', None
+
+    return {'index': index, 'lobby': lobby, 'submit': submit, 'dashboard': dashboard}
+
+
+def run_workload(request_factories, total, concurrency):
+    import eventlet
+
+    latencies, errors = [], [0]
+    factories = list(request_factories)
+
+    def worker(i):
+        url, body = factories[i % len(factories)]()
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, data=body), timeout=30) as response:
+                response.read()
+            latencies.append((time.perf_counter() - started) * 1000)
+        except (urllib.error.URLError, OSError):
+            errors[0] += 1
+
+    pool = eventlet.GreenPool(concurrency)
+    started = time.perf_counter()
+    for i in range(total):
+        pool.spawn_n(worker, i)
+    pool.waitall()
+    return summarize(latencies, errors[0], time.perf_counter() - started)
+
+
+def measure_fanout(app, socketio, live_id, clients, events):
+    from views import emit_game_event
+
+    test_clients = [socketio.test_client(app, namespace='/game') for _ in range(clients)]
+    for client in test_clients:
+        client.emit('join', {'game_id': live_id}, namespace='/game')
+        client.get_received('/game')
+
+    timings = []
+    for i in range(events):
+        started = time.perf_counter()
+        emit_game_event('player_score_update', {'game_id': live_id, 'player_address': 'bench', 'score': i}, live_id)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    delivered = sum(len(client.get_received('/game')) for client in test_clients)
+    for client in test_clients:
+        client.disconnect(namespace='/game')
+
+    return {
+        'clients': clients,
+        'events': events,
+        'delivered': delivered,
+        'expected': clients * events,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(report, previous):
+    print('\nComparison with previous run (p95 ms, throughput rps):')
+    for name, result in report['routes'].items():
+        old = previous.get('routes', {}).get(name)
+        if old:
+            print(f"  {name:<10} p95 {old['p95_ms']:>9.3f} -> {result['p95_ms']:>9.3f}   "
+                  f"rps {old['throughput_rps']:>8.1f} -> {result['throughput_rps']:>8.1f}")
+    old_fanout = previous.get('fanout')
+    if old_fanout:
+        print(f"  {'fanout':<10} p95 {old_fanout['p95_ms']:>9.3f} -> {report['fanout']['p95_ms']:>9.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', help='Database to boot the app against (default: a temporary SQLite file)')
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--players-per-game', type=int, default=50)
+    parser.add_argument('--questions-per-game', type=int, default=12)
+    parser.add_argument('--requests', type=int, default=500, help='Requests per route and for the mixed run')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--socket-clients', type=int, default=100)
+    parser.add_argument('--socket-events', type=int, default=50)
+    parser.add_argument('--json', dest='json_path', help='Write the report to this file')
+    parser.add_argument('--compare', help='Previous JSON report to compare against')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'load.db')
+
+    import eventlet
+    eventlet.monkey_patch()
+    from flask_migrate import upgrade
+    from app import create_app, start_background_tasks
+    from extensions import db, socketio
+    from database import pool_metrics
+
+    # Measure the routes themselves: one client address would trip the rate limiter
+    app = create_app({'RATE_LIMIT_ENABLED': False})
+    with app.app_context():
+        upgrade(directory=os.path.join(ROOT, 'migrations'))
+    start_background_tasks(app)
+
+    lobby_ids, live_id, addresses = seed(app, db, args.games, args.players_per_game, args.questions_per_game)
+    base_url = start_server(app)
+    scenarios = build_scenarios(base_url, lobby_ids, live_id, addresses, args.questions_per_game)
+
+    report = {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'revision': git_revision(),
+        'config': {k: v for k, v in vars(args).items() if k not in ('json_path', 'compare')},
+        'routes': {},
+    }
+    for name, factory in scenarios.items():
+        report['routes'][name] = run_workload([factory], args.requests, args.concurrency)
+    report['routes']['mixed'] = run_workload(scenarios.values(), args.requests, args.concurrency)
+    report['fanout'] = measure_fanout(app, socketio, live_id, args.socket_clients, args.socket_events)
+    report['db_pool'] = pool_metrics.snapshot()
+
+    print(f"{'route':<10} {'reqs':>6} {'errs':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, r in report['routes'].items():
+        print(f"{name:<10} {r['requests']:>6} {r['errors']:>5} {r['throughput_rps']:>8.1f} "
+              f"{r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} {r['p99_ms']:>9.3f}")
+    f = report['fanout']
+    print(f"\nSocket.IO fan-out to {f['clients']} clients: p50 {f['p50_ms']:.3f} ms, "
+          f"p95 {f['p95_ms']:.3f} ms, p99 {f['p99_ms']:.3f} ms ({f['delivered']}/{f['expected']} delivered)")
+    p = report['db_pool']
+    print(f"DB pool ({app.config['DATABASE_PROFILE']}): {p['checkouts']} checkouts, "
+          f"avg wait {p['avg_wait_ms']:.3f} ms, max wait {p['max_wait_ms']:.3f} ms, {p['timeouts']} timeouts, "
+          f"{p['connect_errors']} connect errors")
+
+    if args.compare:
+        with open(args.compare) as fp:
+            print_comparison(report, json.load(fp))
+
+    if args.json_path:
+        with open(args.json_path, 'w') as fp:
+            json.dump(report, fp, indent=2)
+        print(f"\nReport written to {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""Seed a large game/player dataset and report query plans and timings for the hot query shapes.
+
+Runs every query shape used by routes.py (and the background subsystems) twice:
+once without the indexes from migration 3d0c9e27d56d and once with them.
+
+    python benchmarks/query_plans.py                                  # temp SQLite file
+    python benchmarks/query_plans.py --database-url postgresql://...  # Postgres
+    python benchmarks/query_plans.py --games 100000 --players-per-game 50 --json plans.json
+
+The default of 100k games x 50 players seeds 5M player rows; use smaller
+numbers for a quick run. The target database is created from scratch, so
+never point this at production.
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, select, func, text  # noqa: E402
+
+from extensions import db  # noqa: E402
+from models import Game, Player, Question  # noqa: E402
+
+HOT_INDEXES = [
+    'ix_game_is_complete_start_time',
+    'ix_game_created_at',
+    'ix_player_game_score_joined',
+    'ix_question_game_id',
+]
+
+
+def seed(engine, games, players_per_game, questions_per_game, chunk_size=10000):
+    game_table, player_table, question_table = Game.__table__, Player.__table__, Question.__table__
+    now = datetime.datetime.now(datetime.timezone.utc)
+    rng = random.Random(42)
+
+    with engine.begin() as conn:
+        rows = []
+        for game_id in range(1, games + 1):
+            start_time = now + datetime.timedelta(minutes=rng.randint(-60 * 24 * 365, 60 * 24))
+            rows.append({
+                'id': game_id, 'time_limit': 300, 'max_players': 100, 'pot_size': 100.0,
+                'entry_value': 1.0, 'start_time': start_time,
+                'end_time': start_time + datetime.timedelta(seconds=300),
+                'is_complete': start_time < now, 'has_started': start_time < now,
+                'created_at': start_time - datetime.timedelta(days=1),
+            })
+            if len(rows) >= chunk_size:
+                conn.execute(game_table.insert(), rows)
+                rows = []
+        if rows:
+            conn.execute(game_table.insert(), rows)
+
+    with engine.begin() as conn:
+        rows = []
+        for game_id in range(1, games + 1):
+            for i in range(players_per_game):
+                rows.append({
+                    'game_id': game_id, 'ethereum_address': f'0x{game_id:020x}{i:020x}',
+                    'score': rng.randint(0, questions_per_game),
+                    'joined_at': now - datetime.timedelta(seconds=rng.randint(0, 86400)),
+                })
+                if len(rows) >= chunk_size:
+                    conn.execute(player_table.insert(), rows)
+                    rows = []
+        if rows:
+            conn.execute(player_table.insert(), rows)
+
+    with engine.begin() as conn:
+        rows = []
+        for game_id in range(1, games + 1):
+            for i in range(questions_per_game):
+                rows.append({'game_id': game_id, 'phrase': f'phrase {i}', 'answer': f'answer {i}'})
+                if len(rows) >= chunk_size:
+                    conn.execute(question_table.insert(), rows)
+                    rows = []
+        if rows:
+            conn.execute(question_table.insert(), rows)
+
+
+def query_shapes(game_id, ethereum_address):
+    """The statements issued by routes.py and the background subsystems, keyed by name."""
+    game, player, question = Game.__table__, Player.__table__, Question.__table__
+    return {
+        'index_listing': select(game).where(game.c.is_complete.is_(False)).order_by(game.c.start_time),
+        'dashboard_page': select(game).order_by(game.c.created_at.desc()).limit(50),
+        'leaderboard': select(player).where(player.c.game_id == game_id)
+                                     .order_by(player.c.score.desc(), player.c.joined_at),
+        'player_lookup': select(player).where(player.c.game_id == game_id,
+                                              player.c.ethereum_address == ethereum_address),
+        'player_count': select(func.count(player.c.id)).where(player.c.game_id == game_id),
+        'answer_key': select(question).where(question.c.game_id == game_id).order_by(question.c.id),
+    }
+
+
+def explain(conn, statement):
+    sql = str(statement.compile(conn, compile_kwargs={'literal_binds': True}))
+    prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+    return [' '.join(str(col) for col in row) for row in conn.execute(text(prefix + sql))]
+
+
+def time_query(conn, statement, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(statement).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run_shapes(engine, game_id, ethereum_address, repeat):
+    results = {}
+    with engine.connect() as conn:
+        for name, statement in query_shapes(game_id, ethereum_address).items():
+            results[name] = {
+                'plan': explain(conn, statement),
+                'median_ms': round(time_query(conn, statement, repeat), 3),
+            }
+    return results
+
+
+def set_hot_indexes(engine, present):
+    indexes = {index.name: index for table in db.metadata.sorted_tables for index in table.indexes}
+    for name in HOT_INDEXES:
+        if present:
+            indexes[name].create(engine, checkfirst=True)
+        else:
+            indexes[name].drop(engine, checkfirst=True)
+    with engine.begin() as conn:
+        conn.execute(text('ANALYZE'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', help='Target database (default: a temporary SQLite file)')
+    parser.add_argument('--games', type=int, default=100000)
+    parser.add_argument('--players-per-game', type=int, default=50)
+    parser.add_argument('--questions-per-game', type=int, default=12)
+    parser.add_argument('--repeat', type=int, default=5, help='Executions per query shape (median is reported)')
+    parser.add_argument('--skip-seed', action='store_true', help='Reuse data already in --database-url')
+    parser.add_argument('--json', dest='json_path', help='Write the full report to this file')
+    args = parser.parse_args()
+
+    database_url = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    engine = create_engine(database_url)
+
+    if not args.skip_seed:
+        db.metadata.drop_all(engine)
+        db.metadata.create_all(engine)
+        set_hot_indexes(engine, present=False)
+        started = time.perf_counter()
+        seed(engine, args.games, args.players_per_game, args.questions_per_game)
+        print(f"Seeded {args.games} games / {args.games * args.players_per_game} players "
+              f"in {time.perf_counter() - started:.1f}s into {engine.url.render_as_string(hide_password=True)}")
+
+    with engine.connect() as conn:
+        game_id = conn.execute(select(func.max(Game.__table__.c.id))).scalar() or 1
+    ethereum_address = f'0x{game_id:020x}{0:020x}'
+
+    report = {'database': engine.dialect.name, 'games': args.games,
+              'players_per_game': args.players_per_game, 'runs': {}}
+    for label, present in (('before', False), ('after', True)):
+        set_hot_indexes(engine, present)
+        report['runs'][label] = run_shapes(engine, game_id, ethereum_address, args.repeat)
+
+    for name in report['runs']['before']:
+        before, after = report['runs']['before'][name], report['runs']['after'][name]
+        print(f"\n== {name}: {before['median_ms']:.3f} ms -> {after['median_ms']:.3f} ms")
+        print('   before: ' + '\n           '.join(before['plan']))
+        print('   after:  ' + '\n           '.join(after['plan']))
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Time end-of-game scoring of a whole game's submissions.
+
+Builds a synthetic answer key and N submissions (a mix of exact, re-cased,
+padded, wrong, blank and short answers, drawn from a realistic number of
+distinct strings) and scores them three ways:
+
+    rows        a normalize-and-compare zip loop per submission (the old per-row path)
+    batch       answers.score_batch() in pure Python
+    numpy       answers.score_batch() with NumPy arrays (skipped if not installed)
+
+    python benchmarks/scoring.py --players 10000 --questions 20
+    python benchmarks/scoring.py --json scoring.json --compare previous.json
+
+Reports the median and worst wall time per method and checks that every
+method returns the same scores.
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import answers  # noqa: E402
+from answers import normalize_answer, score_batch  # noqa: E402
+
+
+def make_game(players, questions, seed=42):
+    rng = random.Random(seed)
+    answer_key = tuple(normalize_answer(f'Answer {i}') for i in range(questions))
+    variants = lambda i: [f'Answer {i}', f'answer {i}', f'  ANSWER  {i} ', f'Answer {i + 1}', 'no idea', '']
+    submissions = []
+    for _ in range(players):
+        width = questions if rng.random() > 0.05 else rng.randint(0, questions)
+        submissions.append([rng.choice(variants(i)) for i in range(width)])
+    return answer_key, submissions
+
+
+def time_method(score, runs):
+    samples, result = [], None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = score()
+        samples.append((time.perf_counter() - started) * 1000)
+    return result, {
+        'runs': runs,
+        'median_ms': round(statistics.median(samples), 2),
+        'max_ms': round(max(samples), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--players', type=int, default=10000)
+    parser.add_argument('--questions', type=int, default=20)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--json', dest='json_path', help='Write the report to this file')
+    parser.add_argument('--compare', help='Previous JSON report to compare against')
+    args = parser.parse_args()
+
+    answer_key, submissions = make_game(args.players, args.questions)
+    methods = {
+        'rows': lambda: [sum(1 for expected, answer in zip(answer_key, submitted)
+                             if expected == normalize_answer(answer)) for submitted in submissions],
+        'batch': lambda: score_batch(answer_key, submissions, use_numpy=False).scores,
+    }
+    if answers.numpy is not None:
+        methods['numpy'] = lambda: score_batch(answer_key, submissions, use_numpy=True).scores
+
+    report = {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'config': {'players': args.players, 'questions': args.questions, 'runs': args.runs},
+        'methods': {},
+    }
+    expected = None
+    for name, score in methods.items():
+        scores, report['methods'][name] = time_method(score, args.runs)
+        if expected is None:
+            expected = scores
+        elif scores != expected:
+            raise SystemExit(f"{name} scores differ from {next(iter(methods))}")
+
+    print(f"{args.players} submissions x {args.questions} questions")
+    print(f"{'method':<8} {'runs':>5} {'median ms':>10} {'max ms':>10}")
+    for name, method in report['methods'].items():
+        print(f"{name:<8} {method['runs']:>5} {method['median_ms']:>10.2f} {method['max_ms']:>10.2f}")
+
+    if args.compare:
+        with open(args.compare) as fp:
+            previous = json.load(fp)
+        print(f"\nCompared with {previous.get('timestamp')}:")
+        for name, method in report['methods'].items():
+            old = previous.get('methods', {}).get(name)
+            if old:
+                print(f"  {name:<8} median {old['median_ms']:>8.2f} -> {method['median_ms']:>8.2f} ms")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as fp:
+            json.dump(report, fp, indent=2)
+
+
+if __name__ == '__main__':
+    main()
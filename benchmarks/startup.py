@@ -0,0 +1,138 @@
+"""Cold-start cost of a worker process and of `flask` CLI commands.
+
+Every measurement runs in a fresh Python process, so nothing is warm from a
+previous run:
+
+    import      `import app` (module imports only)
+    factory     `create_app()`: config, extensions, blueprints, CLI commands
+    worker      create_app() plus start_background_tasks(), i.e. what a
+                serving worker pays before it can take its first request
+    first_req   worker plus the first GET / (engine connect, first queries)
+    cli         `flask routes`: a CLI command that never touches the database
+
+    python benchmarks/startup.py --runs 10
+    python benchmarks/startup.py --json startup.json --compare previous.json
+
+Reports the median and worst wall time per stage; --json saves the report so
+runs can be compared with --compare.
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Wall time of the whole process, interpreter boot included, as a new worker pays it
+PRELUDE = "import sys\nsys.path.insert(0, {root!r})\n"
+STAGES = {
+    'import': "import app\n",
+    'factory': "from app import create_app\ncreate_app()\n",
+    'worker': ("import eventlet\neventlet.monkey_patch()\n"
+               "from app import create_app, start_background_tasks\n"
+               "start_background_tasks(create_app())\n"),
+    'first_req': ("import eventlet\neventlet.monkey_patch()\n"
+                  "from app import create_app, start_background_tasks\n"
+                  "app = create_app()\nstart_background_tasks(app)\n"
+                  "assert app.test_client().get('/').status_code == 200\n"),
+}
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_stage(code, env):
+    """Run one snippet in a fresh interpreter; returns its wall time in ms."""
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', PRELUDE.format(root=ROOT) + code],
+                            cwd=tempfile.gettempdir(), env=env, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed')
+    return wall_ms
+
+
+def run_cli(env):
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-m', 'flask', 'routes'], cwd=tempfile.gettempdir(),
+                            env=dict(env, FLASK_APP=os.path.join(ROOT, 'app.py')), capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed')
+    return wall_ms
+
+
+def summarize(samples):
+    return {
+        'runs': len(samples),
+        'median_ms': round(statistics.median(samples), 1),
+        'max_ms': round(max(samples), 1),
+    }
+
+
+def prepare_database(env):
+    """Migrate the throwaway database once so first_req measures serving, not schema creation."""
+    code = ("from app import create_app\nfrom flask_migrate import upgrade\n"
+            f"app = create_app()\nwith app.app_context():\n    upgrade(directory={os.path.join(ROOT, 'migrations')!r})\n")
+    subprocess.run([sys.executable, '-c', PRELUDE.format(root=ROOT) + code], cwd=tempfile.gettempdir(),
+                   env=env, capture_output=True, check=True)
+
+
+def print_comparison(report, previous):
+    print(f"\nCompared with {previous.get('revision') or 'previous run'} ({previous.get('timestamp')}):")
+    for name, stage in report['stages'].items():
+        old = previous.get('stages', {}).get(name)
+        if old:
+            print(f"  {name:<10} median {old['median_ms']:>8.1f} -> {stage['median_ms']:>8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', help='Database to boot against (default: a temporary SQLite file)')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--json', dest='json_path', help='Write the report to this file')
+    parser.add_argument('--compare', help='Previous JSON report to compare against')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'startup.db')
+    prepare_database(env)
+
+    report = {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'revision': git_revision(),
+        'config': {'runs': args.runs},
+        'stages': {},
+    }
+    measurements = dict(STAGES)
+    measurements['cli'] = None
+    for name, code in measurements.items():
+        samples = []
+        for _ in range(args.runs):
+            samples.append(run_cli(env) if code is None else run_stage(code, env))
+        report['stages'][name] = summarize(samples)
+
+    print(f"{'stage':<10} {'runs':>5} {'median ms':>10} {'max ms':>10}")
+    for name, stage in report['stages'].items():
+        print(f"{name:<10} {stage['runs']:>5} {stage['median_ms']:>10.1f} {stage['max_ms']:>10.1f}")
+
+    if args.compare:
+        with open(args.compare) as fp:
+            print_comparison(report, json.load(fp))
+
+    if args.json_path:
+        with open(args.json_path, 'w') as fp:
+            json.dump(report, fp, indent=2)
+
+
+if __name__ == '__main__':
+    main()
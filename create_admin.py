@@ -1,4 +1,5 @@
-from app import app, db
+from app import create_app
+from extensions import db
 from models import Admin
 from werkzeug.security import generate_password_hash
 import logging
@@ -8,6 +9,7 @@ logging.basicConfig(level=logging.INFO)
 
 def recreate_admin_user():
     """Delete the existing admin user and create a new one."""
+    app = create_app()
     with app.app_context():
         try:
             # Check if the admin user exists
@@ -0,0 +1,239 @@
+import os
+import threading
+import time
+from logging import getLogger
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+from extensions import db
+
+
+# Initialize logger
+logger = getLogger(__name__)
+
+DEFAULT_DATABASE_URL = 'sqlite:///test.db'
+
+# Named engine profiles. Values can be overridden per deployment through the
+# environment variable given next to each one.
+PROFILES = {
+    'sqlite-dev': {
+        'busy_timeout_ms': 5000,            # SQLITE_BUSY_TIMEOUT_MS
+        'pool_size': 5,                     # DB_POOL_SIZE
+        'max_overflow': 10,                 # DB_MAX_OVERFLOW
+        'pool_timeout': 30,                 # DB_POOL_TIMEOUT (seconds)
+    },
+    'postgres-prod': {
+        'pool_size': 10,                    # DB_POOL_SIZE
+        'max_overflow': 20,                 # DB_MAX_OVERFLOW
+        'pool_timeout': 10,                 # DB_POOL_TIMEOUT (seconds)
+        'pool_recycle': 1800,               # DB_POOL_RECYCLE (seconds)
+        'statement_timeout_ms': 5000,       # DB_STATEMENT_TIMEOUT_MS
+    },
+}
+
+ENV_OVERRIDES = {
+    'busy_timeout_ms': 'SQLITE_BUSY_TIMEOUT_MS',
+    'pool_size': 'DB_POOL_SIZE',
+    'max_overflow': 'DB_MAX_OVERFLOW',
+    'pool_timeout': 'DB_POOL_TIMEOUT',
+    'pool_recycle': 'DB_POOL_RECYCLE',
+    'statement_timeout_ms': 'DB_STATEMENT_TIMEOUT_MS',
+}
+
+# Upper bounds (ms) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    """How long requests wait to check a connection out of the pool.
+
+    Under eventlet every greenthread that touches the database competes for a
+    pool slot; sustained waits or timeouts mean pool_size / max_overflow are too
+    small for the real concurrency, while zero waits with a large pool mean it
+    can shrink.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pool = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.connect_errors = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+            self.buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def record(self, waited, timed_out=False, failed=False):
+        """Count one checkout; `timed_out` if the pool had no free slot, `failed` if connecting failed."""
+        waited_ms = waited * 1000
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            if failed:
+                self.connect_errors += 1
+                return
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            for i, bound in enumerate(WAIT_BUCKETS_MS):
+                if waited_ms <= bound:
+                    self.buckets[i] += 1
+                    break
+            else:
+                self.buckets[-1] += 1
+
+    def snapshot(self):
+        with self._lock:
+            data = {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'connect_errors': self.connect_errors,
+                'avg_wait_ms': round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 3),
+                'wait_histogram_ms': dict(zip([f'<={b}' for b in WAIT_BUCKETS_MS] + [f'>{WAIT_BUCKETS_MS[-1]}'],
+                                              self.buckets)),
+            }
+        pool = self.pool
+        if pool is not None:
+            data.update({
+                'pool_size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': pool.overflow(),
+            })
+        return data
+
+    def collect(self):
+        """Prometheus exposition lines for metrics.Instrumentation.add_collector."""
+        data = self.snapshot()
+        lines = ['# HELP wtw_db_pool_checkouts_total Connections checked out of the pool.',
+                 '# TYPE wtw_db_pool_checkouts_total counter',
+                 f"wtw_db_pool_checkouts_total {data['checkouts']}",
+                 '# HELP wtw_db_pool_timeouts_total Checkouts that gave up waiting for a connection.',
+                 '# TYPE wtw_db_pool_timeouts_total counter',
+                 f"wtw_db_pool_timeouts_total {data['timeouts']}",
+                 '# HELP wtw_db_pool_connect_errors_total Checkouts that failed to open a new connection.',
+                 '# TYPE wtw_db_pool_connect_errors_total counter',
+                 f"wtw_db_pool_connect_errors_total {data['connect_errors']}",
+                 '# HELP wtw_db_pool_checkout_wait_seconds Time spent waiting for a pooled connection.',
+                 '# TYPE wtw_db_pool_checkout_wait_seconds histogram']
+        with self._lock:
+            cumulative = 0
+            for bound, count in zip(WAIT_BUCKETS_MS, self.buckets):
+                cumulative += count
+                lines.append(f'wtw_db_pool_checkout_wait_seconds_bucket{{le="{bound / 1000}"}} {cumulative}')
+            lines.append(f'wtw_db_pool_checkout_wait_seconds_bucket{{le="+Inf"}} {self.checkouts}')
+            lines.append(f'wtw_db_pool_checkout_wait_seconds_count {self.checkouts}')
+            lines.append(f'wtw_db_pool_checkout_wait_seconds_sum {self.total_wait}')
+        for key in ('pool_size', 'checked_out', 'overflow'):
+            if key in data:
+                lines.extend([f'# TYPE wtw_db_pool_{key} gauge', f'wtw_db_pool_{key} {data[key]}'])
+        return lines
+
+
+pool_metrics = PoolMetrics()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a free connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        except Exception:
+            # The database refused or dropped the connection: not a sign the pool is too small
+            pool_metrics.record(time.perf_counter() - started, failed=True)
+            raise
+        pool_metrics.record(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool_metrics.pool = pool
+        return pool
+
+
+def default_profile(database_url):
+    return 'postgres-prod' if make_url(database_url).get_backend_name() == 'postgresql' else 'sqlite-dev'
+
+
+def load_profile(name):
+    if name not in PROFILES:
+        raise ValueError(f"Unknown DATABASE_PROFILE {name!r}; expected one of {', '.join(PROFILES)}")
+    settings = dict(PROFILES[name])
+    for key, env_name in ENV_OVERRIDES.items():
+        if key in settings and os.environ.get(env_name):
+            settings[key] = int(os.environ[env_name])
+    return settings
+
+
+def engine_options(database_url, profile):
+    """SQLALCHEMY_ENGINE_OPTIONS for a profile."""
+    settings = load_profile(profile)
+    url = make_url(database_url)
+    options = {
+        'poolclass': TimedQueuePool,
+        'pool_size': settings['pool_size'],
+        'max_overflow': settings['max_overflow'],
+        'pool_timeout': settings['pool_timeout'],
+    }
+
+    if url.get_backend_name() == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            # In-memory databases live in a single connection; keep SQLAlchemy's default pool
+            return {}
+        options['connect_args'] = {
+            'timeout': settings.get('busy_timeout_ms', 5000) / 1000,
+            'check_same_thread': False,
+        }
+    else:
+        options['pool_pre_ping'] = True
+        options['pool_recycle'] = settings.get('pool_recycle', 1800)
+        if url.get_backend_name() == 'postgresql' and settings.get('statement_timeout_ms'):
+            options['connect_args'] = {'options': f"-c statement_timeout={settings['statement_timeout_ms']}"}
+    return options
+
+
+def _set_sqlite_pragmas(busy_timeout_ms):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # WAL lets readers proceed while a writer commits; NORMAL is durable enough under WAL
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute(f'PRAGMA busy_timeout={int(busy_timeout_ms)}')
+        cursor.close()
+    return on_connect
+
+
+def configure_database(app):
+    """Set the database URI and engine options from DATABASE_URL / DATABASE_PROFILE (app config, then environment)."""
+    database_url = app.config.get('DATABASE_URL') or os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URL)
+    profile = app.config.get('DATABASE_PROFILE') or os.environ.get('DATABASE_PROFILE') or default_profile(database_url)
+
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(database_url, profile)
+    app.config['DATABASE_PROFILE'] = profile
+    logger.info(f"Database profile {profile}: {app.config['SQLALCHEMY_ENGINE_OPTIONS']}")
+
+
+def init_engine(app):
+    """Attach the profile's connection hooks and pool metrics once the engine exists."""
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name == 'sqlite':
+            busy_timeout_ms = load_profile(app.config['DATABASE_PROFILE']).get('busy_timeout_ms', 5000)
+            event.listen(engine, 'connect', _set_sqlite_pragmas(busy_timeout_ms))
+        if isinstance(engine.pool, TimedQueuePool):
+            pool_metrics.pool = engine.pool
@@ -0,0 +1,236 @@
+import csv
+import datetime
+import heapq
+import io
+import json
+import zlib
+from logging import getLogger
+
+import click
+from sqlalchemy import func, select
+
+from archive import decode_payload
+from extensions import db
+from models import ArchivedGame, Game, Player
+
+
+# Initialize logger
+logger = getLogger(__name__)
+
+FORMATS = ('csv', 'jsonl')
+KINDS = ('results', 'players')
+YIELD_PER = 1000
+FLUSH_BYTES = 64 * 1024
+
+RESULT_FIELDS = ('game_id', 'start_time', 'end_time', 'pot_size', 'entry_value', 'player_count',
+                 'winner_address', 'winner_score', 'winner_joined_at')
+PLAYER_FIELDS = ('game_id', 'start_time', 'end_time', 'ethereum_address', 'score', 'joined_at', 'rank',
+                 'is_winner')
+
+
+class ExportError(Exception):
+    """Raised for an unknown export kind / format or an unparseable date range."""
+
+
+def parse_bound(value):
+    """Parse a YYYY-MM-DD or ISO 8601 date range bound as UTC; empty means unbounded."""
+    value = (value or '').strip()
+    if not value:
+        return None
+    try:
+        bound = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ExportError(f"invalid date {value!r}; expected YYYY-MM-DD or ISO 8601")
+    if bound.tzinfo is None:
+        bound = bound.replace(tzinfo=datetime.timezone.utc)
+    return bound.astimezone(datetime.timezone.utc)
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+def _ranked_rows(since=None, until=None):
+    """Every completed game in [since, until) with its players in leaderboard order.
+
+    One query over Game LEFT JOIN Player, read in batches of YIELD_PER through a
+    server-side cursor where the driver has one, so memory does not grow with
+    the number of games. Ordering matches leaderboard.Leaderboard (score desc,
+    joined_at, address), which is what utils.determine_winner returns.
+    """
+    stmt = (
+        select(Game.id, Game.start_time, Game.end_time, Game.pot_size, Game.entry_value,
+               Player.ethereum_address, func.coalesce(Player.score, 0), Player.joined_at)
+        .select_from(Game)
+        .outerjoin(Player, Player.game_id == Game.id)
+        .where(Game.is_complete.is_(True))
+        .order_by(Game.start_time, Game.id, func.coalesce(Player.score, 0).desc(), Player.joined_at,
+                  Player.ethereum_address)
+        .execution_options(stream_results=True)
+    )
+    if since is not None:
+        stmt = stmt.where(Game.start_time >= since)
+    if until is not None:
+        stmt = stmt.where(Game.start_time < until)
+    return db.session.execute(stmt).yield_per(YIELD_PER)
+
+
+def _hot_games(since=None, until=None):
+    """(game, players) per completed game still in the game / player tables."""
+    game, players = None, []
+    for row in _ranked_rows(since, until):
+        if game is None or row[0] != game[0]:
+            if game is not None:
+                yield game, players
+            game, players = tuple(row[:5]), []
+        if row[5] is not None:
+            players.append((row[5], row[6], row[7]))
+    if game is not None:
+        yield game, players
+
+
+def _archived_games(since=None, until=None):
+    """(game, players) per archived game, decoding its blob; the archiver stored players ranked."""
+    stmt = (
+        select(ArchivedGame.id, ArchivedGame.start_time, ArchivedGame.end_time, ArchivedGame.pot_size,
+               ArchivedGame.entry_value, ArchivedGame.payload)
+        .order_by(ArchivedGame.start_time, ArchivedGame.id)
+        .execution_options(stream_results=True)
+    )
+    if since is not None:
+        stmt = stmt.where(ArchivedGame.start_time >= since)
+    if until is not None:
+        stmt = stmt.where(ArchivedGame.start_time < until)
+    for row in db.session.execute(stmt).yield_per(YIELD_PER):
+        players, _ = decode_payload(row[5])
+        yield tuple(row[:5]), [(player.ethereum_address, player.score, player.joined_at) for player in players]
+
+
+def _ranked_games(since=None, until=None):
+    """Hot and archived games in range merged into one stream ordered by (start_time, id).
+
+    Games older than ARCHIVE_AFTER_DAYS have left the hot tables, so a payout
+    export over an old range would otherwise come back empty.
+    """
+    return heapq.merge(_hot_games(since, until), _archived_games(since, until),
+                       key=lambda item: (item[0][1], item[0][0]))
+
+
+def iter_players(since=None, until=None):
+    """One dict per player of every completed game in range, with their final rank."""
+    for game, players in _ranked_games(since, until):
+        for rank, (address, score, joined_at) in enumerate(players, start=1):
+            yield {
+                'game_id': game[0],
+                'start_time': _isoformat(game[1]),
+                'end_time': _isoformat(game[2]),
+                'ethereum_address': address,
+                'score': score,
+                'joined_at': _isoformat(joined_at),
+                'rank': rank,
+                'is_winner': rank == 1,
+            }
+
+
+def iter_results(since=None, until=None):
+    """One dict per completed game in range: its winner, winning score and player count."""
+    for game, players in _ranked_games(since, until):
+        # The first player of a game is its winner
+        winner = players[0] if players else (None, None, None)
+        yield {
+            'game_id': game[0],
+            'start_time': _isoformat(game[1]),
+            'end_time': _isoformat(game[2]),
+            'pot_size': game[3],
+            'entry_value': game[4],
+            'player_count': len(players),
+            'winner_address': winner[0],
+            'winner_score': winner[1],
+            'winner_joined_at': _isoformat(winner[2]),
+        }
+
+
+def _encode(records, fmt, fields):
+    """Serialize records to CSV or JSONL, yielding text in chunks of about FLUSH_BYTES."""
+    buffer = io.StringIO()
+    writer = None
+    if fmt == 'csv':
+        writer = csv.DictWriter(buffer, fieldnames=fields, lineterminator='\n')
+        writer.writeheader()
+    for record in records:
+        if writer is not None:
+            writer.writerow(record)
+        else:
+            buffer.write(json.dumps(record))
+            buffer.write('\n')
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export(kind, fmt='csv', since=None, until=None, compress=False):
+    """Stream an export as an iterator of bytes chunks, gzipped if `compress`."""
+    if kind not in KINDS:
+        raise ExportError(f"unknown export {kind!r}; expected one of {', '.join(KINDS)}")
+    if fmt not in FORMATS:
+        raise ExportError(f"unknown format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    if kind == 'results':
+        records, fields = iter_results(since, until), RESULT_FIELDS
+    else:
+        records, fields = iter_players(since, until), PLAYER_FIELDS
+
+    chunks = (text.encode('utf-8') for text in _encode(records, fmt, fields))
+    return _gzip(chunks) if compress else chunks
+
+
+def export_filename(kind, fmt, since=None, until=None, compress=False):
+    parts = [kind]
+    if since is not None:
+        parts.append(since.strftime('%Y%m%d'))
+    if until is not None:
+        parts.append(until.strftime('%Y%m%d'))
+    return '-'.join(parts) + f'.{fmt}' + ('.gz' if compress else '')
+
+
+def init_app(app):
+    @app.cli.command('export-games')
+    @click.argument('kind', type=click.Choice(KINDS))
+    @click.option('--format', 'fmt', type=click.Choice(FORMATS), default='csv', show_default=True)
+    @click.option('--since', help='Only games starting at or after this date (YYYY-MM-DD or ISO 8601).')
+    @click.option('--until', help='Only games starting before this date.')
+    @click.option('--output', '-o', type=click.Path(dir_okay=False, writable=True),
+                  help='Defaults to stdout; gzipped when the name ends in .gz.')
+    def export_games_command(kind, fmt, since, until, output):
+        """Export winners (results) or every player's score (players) of completed games."""
+        try:
+            since, until = parse_bound(since), parse_bound(until)
+            compress = bool(output and output.endswith('.gz'))
+            chunks = export(kind, fmt, since, until, compress)
+        except ExportError as e:
+            raise click.BadParameter(str(e))
+
+        if output is None:
+            stream = click.get_binary_stream('stdout')
+            for chunk in chunks:
+                stream.write(chunk)
+            stream.flush()
+            return
+        written = 0
+        with open(output, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                written += len(chunk)
+        logger.info(f"Exported {kind} to {output} ({written} bytes)")
+        click.echo(f"Wrote {written} bytes to {output}", err=True)
@@ -0,0 +1,66 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from logging import getLogger
+
+from markupsafe import Markup
+
+
+# Initialize logger
+logger = getLogger(__name__)
+
+CachedFragment = namedtuple('CachedFragment', ['version', 'html', 'expires'])
+
+
+class FragmentCache:
+    """Rendered HTML fragments keyed by name, reused until their game version changes.
+
+    Callers pass `game_versions.current` (any game changed) or
+    `game_versions.game(id)` (one game changed) as the version, so every write
+    path that already bumps a version also invalidates the fragments built from
+    it. The TTL bounds staleness for changes made by other worker processes.
+    """
+
+    def __init__(self, max_entries=1000, ttl=5):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version, render):
+        """Return the cached fragment for `key`, calling `render()` when it is missing or stale."""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry.version == version and entry.expires > now:
+            self.hits += 1
+            return entry.html
+
+        self.misses += 1
+        html = Markup(render())
+        with self._lock:
+            self._entries[key] = CachedFragment(version, html, now + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return html
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def collect(self):
+        """Prometheus exposition lines for metrics.add_collector."""
+        return [
+            '# HELP wtw_fragment_cache_requests_total Rendered fragment lookups by result.',
+            '# TYPE wtw_fragment_cache_requests_total counter',
+            f'wtw_fragment_cache_requests_total{{result="hit"}} {self.hits}',
+            f'wtw_fragment_cache_requests_total{{result="miss"}} {self.misses}',
+            '# HELP wtw_fragment_cache_entries Rendered fragments currently cached.',
+            '# TYPE wtw_fragment_cache_entries gauge',
+            f'wtw_fragment_cache_entries {len(self._entries)}',
+        ]
+
+
+fragment_cache = FragmentCache()
@@ -0,0 +1,281 @@
+import csv
+import datetime
+import io
+import json
+import math
+from collections import OrderedDict, namedtuple
+from logging import getLogger
+
+import click
+
+from answers import answer_keys
+from extensions import db, socketio
+from lifecycle import game_scheduler
+from models import Game
+from question_bank import QuestionSpec, question_bank, question_set_hash
+from stats import game_statistics
+from versions import game_versions
+from views import LOBBY_ROOM
+
+
+# Initialize logger
+logger = getLogger(__name__)
+
+FORMATS = ('csv', 'jsonl')
+MAX_QUESTIONS = 12
+MAX_TEXT_LENGTH = 255
+START_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+GameSpec = namedtuple('GameSpec', ['line', 'time_limit', 'max_players', 'pot_size', 'entry_value',
+                                   'start_time', 'question_set'])
+
+
+class ImportValidationError(Exception):
+    """Raised with every validation problem found in an import file."""
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} validation error(s)")
+        self.errors = errors
+
+
+def _parse_start_time(value):
+    if not isinstance(value, str):
+        raise TypeError(f"start_time must be a string, not {type(value).__name__}")
+    value = value.strip()
+    try:
+        start_time = datetime.datetime.strptime(value, START_TIME_FORMAT)
+    except ValueError:
+        start_time = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if start_time.tzinfo is None:
+        start_time = start_time.replace(tzinfo=datetime.timezone.utc)
+    return start_time.astimezone(datetime.timezone.utc)
+
+
+class _Validator:
+    """Collects every error in one pass instead of stopping at the first one."""
+
+    def __init__(self):
+        self.errors = []
+        self.now = datetime.datetime.now(datetime.timezone.utc)
+
+    def error(self, line, message):
+        self.errors.append({'line': line, 'message': message})
+
+    def number(self, line, record, field, cast, minimum, maximum=None):
+        raw = record.get(field)
+        try:
+            if isinstance(raw, bool) or not isinstance(raw, (str, int, float)):
+                raise TypeError(field)
+            value = cast(raw)
+        except (TypeError, ValueError):
+            self.error(line, f"{field} must be a number")
+            return None
+        if not math.isfinite(value):
+            self.error(line, f"{field} must be a finite number")
+            return None
+        if value < minimum or (maximum is not None and value > maximum):
+            bounds = f"between {minimum} and {maximum}" if maximum is not None else f"at least {minimum}"
+            self.error(line, f"{field} must be {bounds}")
+            return None
+        return value
+
+    def questions(self, line, items):
+        questions = []
+        if not isinstance(items, list):
+            items = []
+        for index, item in enumerate(items, start=1):
+            if not isinstance(item, dict):
+                self.error(line, f"question {index} must be an object with a phrase and an answer")
+                continue
+            phrase, answer = item.get('phrase'), item.get('answer')
+            if not isinstance(phrase or '', str) or not isinstance(answer or '', str):
+                self.error(line, f"question {index} phrase and answer must be text")
+                continue
+            phrase, answer = (phrase or '').strip(), (answer or '').strip()
+            if not phrase or not answer:
+                self.error(line, f"question {index} needs both a phrase and an answer")
+            elif len(phrase) > MAX_TEXT_LENGTH or len(answer) > MAX_TEXT_LENGTH:
+                self.error(line, f"question {index} is longer than {MAX_TEXT_LENGTH} characters")
+            else:
+                questions.append(QuestionSpec(phrase, answer))
+        if not 1 <= len(items) <= MAX_QUESTIONS:
+            self.error(line, f"a game needs between 1 and {MAX_QUESTIONS} questions")
+        return tuple(questions)
+
+    def game(self, line, record, questions):
+        # Same rules as forms.CreateGameForm
+        time_limit = self.number(line, record, 'time_limit', int, 60, 3600)
+        max_players = self.number(line, record, 'max_players', int, 2, 100)
+        pot_size = self.number(line, record, 'pot_size', float, 1)
+        entry_value = self.number(line, record, 'entry_value', float, 0)
+        try:
+            start_time = _parse_start_time(record.get('start_time'))
+        except (TypeError, ValueError):
+            self.error(line, f"start_time must be {START_TIME_FORMAT} or ISO 8601")
+            start_time = None
+        if start_time is not None and start_time <= self.now:
+            self.error(line, "start_time must be in the future")
+        return GameSpec(line, time_limit, max_players, pot_size, entry_value, start_time, questions)
+
+
+def _intern(question_sets, questions):
+    """Return the one shared tuple for a question set, keyed by its content hash."""
+    return question_sets.setdefault(question_set_hash(questions), questions)
+
+
+def parse_jsonl(stream):
+    """One JSON object per line: a game, or a named question set games can refer to.
+
+        {"question_set": "capitals", "questions": [{"phrase": "...", "answer": "..."}, ...]}
+        {"start_time": "2026-11-01 18:00:00", "time_limit": 300, "max_players": 50,
+         "pot_size": 100, "entry_value": 1, "question_set": "capitals"}
+        {"start_time": "...", ..., "questions": [{"phrase": "...", "answer": "..."}]}
+    """
+    validator = _Validator()
+    named_sets, question_sets, records = {}, OrderedDict(), []
+
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError as e:
+            validator.error(line, f"invalid JSON: {e}")
+            continue
+        if not isinstance(record, dict):
+            validator.error(line, "each line must be a JSON object")
+        elif not isinstance(record.get('question_set', ''), str):
+            validator.error(line, "question_set must be a string")
+        elif 'start_time' not in record and 'question_set' in record:
+            named_sets[record['question_set']] = _intern(question_sets,
+                                                         validator.questions(line, record.get('questions')))
+        else:
+            records.append((line, record))
+
+    games = []
+    for line, record in records:
+        if 'questions' in record:
+            questions = _intern(question_sets, validator.questions(line, record['questions']))
+        elif record.get('question_set') in named_sets:
+            questions = named_sets[record['question_set']]
+        else:
+            validator.error(line, f"unknown question_set {record.get('question_set')!r}")
+            questions = ()
+        games.append(validator.game(line, record, questions))
+
+    if validator.errors:
+        raise ImportValidationError(validator.errors)
+    return games, len(question_sets)
+
+
+def parse_csv(stream):
+    """One row per question; rows sharing a `game` key make up one game, in file order.
+
+        game,start_time,time_limit,max_players,pot_size,entry_value,phrase,answer
+
+    Game columns are read from the first row of each game.
+    """
+    validator = _Validator()
+    question_sets = OrderedDict()
+    grouped = OrderedDict()
+
+    reader = csv.DictReader(stream)
+    missing = {'game', 'start_time', 'time_limit', 'max_players', 'pot_size', 'entry_value',
+               'phrase', 'answer'} - set(reader.fieldnames or ())
+    if missing:
+        raise ImportValidationError([{'line': 1, 'message': f"missing columns: {', '.join(sorted(missing))}"}])
+
+    for line, row in enumerate(reader, start=2):
+        key = (row.get('game') or '').strip()
+        if not key:
+            validator.error(line, "game is required")
+            continue
+        grouped.setdefault(key, (line, row, []))[2].append(row)
+
+    games = []
+    for key, (line, row, items) in grouped.items():
+        questions = _intern(question_sets, validator.questions(line, items))
+        games.append(validator.game(line, row, questions))
+
+    if validator.errors:
+        raise ImportValidationError(validator.errors)
+    return games, len(question_sets)
+
+
+def parse_import(data, fmt):
+    """Parse and validate an import file (text) into GameSpecs. Raises ImportValidationError."""
+    if fmt not in FORMATS:
+        raise ImportValidationError([{'line': 0, 'message': f"unknown format {fmt!r}; expected one of {', '.join(FORMATS)}"}])
+    stream = io.StringIO(data)
+    return parse_csv(stream) if fmt == 'csv' else parse_jsonl(stream)
+
+
+def import_games(specs):
+    """Insert every game and its questions in a single transaction; returns the new Games."""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    games = [Game(time_limit=spec.time_limit, max_players=spec.max_players, pot_size=spec.pot_size,
+                  entry_value=spec.entry_value, start_time=spec.start_time,
+                  end_time=spec.start_time + datetime.timedelta(seconds=spec.time_limit), created_at=now)
+             for spec in specs]
+    try:
+        # Each distinct question set is stored once in the question bank and shared
+        set_ids = {}
+        for game, spec in zip(games, specs):
+            key = question_set_hash(spec.question_set)
+            if key not in set_ids:
+                set_ids[key] = question_bank.get_or_create(spec.question_set)
+            game.question_set_id = set_ids[key]
+        db.session.add_all(games)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    for game, spec in zip(games, specs):
+        game_statistics.record_game_created(game)
+        answer_keys.prime(game.id, spec.question_set, game.question_set_id)
+        # Only this process's scheduler; when run as `flask import-games` the serving
+        # workers' schedulers pick the games up on their next rescan (lifecycle.py)
+        game_scheduler.schedule(game)
+    game_versions.bump()
+
+    # One event for the whole batch instead of one game_created per game
+    socketio.emit('games_created', {'game_ids': [game.id for game in games], 'count': len(games)},
+                  to=LOBBY_ROOM, namespace='/game')
+    logger.info(f"Imported {len(games)} games")
+    return games
+
+
+def detect_format(filename, fmt=None):
+    if fmt:
+        return fmt.lower()
+    extension = (filename or '').rsplit('.', 1)[-1].lower()
+    return 'jsonl' if extension in ('jsonl', 'ndjson', 'json') else extension
+
+
+def init_app(app):
+    @app.cli.command('import-games')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'fmt', type=click.Choice(FORMATS), help='Defaults to the file extension.')
+    @click.option('--dry-run', is_flag=True, help='Validate the file without creating any games.')
+    def import_games_command(path, fmt, dry_run):
+        """Create games and their questions in bulk from a CSV or JSONL file."""
+        try:
+            with open(path, encoding='utf-8-sig') as f:
+                data = f.read()
+        except UnicodeDecodeError as e:
+            click.echo(f"{path} is not UTF-8 text: {e}", err=True)
+            raise SystemExit(1)
+        try:
+            specs, question_sets = parse_import(data, detect_format(path, fmt))
+        except ImportValidationError as e:
+            for error in e.errors:
+                click.echo(f"line {error['line']}: {error['message']}", err=True)
+            raise SystemExit(1)
+
+        if dry_run:
+            click.echo(f"{len(specs)} games and {question_sets} distinct question sets are valid")
+            return
+        games = import_games(specs)
+        click.echo(f"Created {len(games)} games ({question_sets} distinct question sets): "
+                   f"{', '.join(str(game.id) for game in games)}")
@@ -0,0 +1,204 @@
+import bisect
+import datetime
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from logging import getLogger
+
+from models import Player
+
+
+# Initialize logger
+logger = getLogger(__name__)
+
+_EPOCH = datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+
+
+class LeaderboardEntry(namedtuple('LeaderboardEntry', ['ethereum_address', 'score', 'joined_at'])):
+    __slots__ = ()
+
+    def to_dict(self):
+        return {
+            'ethereum_address': self.ethereum_address,
+            'score': self.score,
+            'joined_at': self.joined_at.isoformat() if self.joined_at != _EPOCH else None
+        }
+
+
+def _utc(dt):
+    if dt is None:
+        return _EPOCH
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=datetime.timezone.utc)
+    return dt
+
+
+class SortedKeys:
+    """Sorted list kept as a list of short sorted blocks plus each block's maximum.
+
+    An insert or removal bisects the block maxima and then shifts one block of
+    at most 2 * load keys, instead of the whole list, so a score write costs
+    O(log n + load) rather than O(n). rank() adds up the lengths of the blocks
+    in front, O(log n + n / load).
+    """
+
+    def __init__(self, load=256):
+        self.load = load
+        self._blocks = []
+        self._maxes = []
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for block in self._blocks:
+            yield from block
+
+    def add(self, key):
+        if not self._blocks:
+            self._blocks.append([key])
+            self._maxes.append(key)
+        else:
+            i = bisect.bisect_left(self._maxes, key)
+            if i == len(self._blocks):
+                i -= 1
+                self._blocks[i].append(key)
+                self._maxes[i] = key
+            else:
+                bisect.insort(self._blocks[i], key)
+            block = self._blocks[i]
+            if len(block) > 2 * self.load:
+                # Split an overgrown block in two
+                self._blocks.insert(i + 1, block[self.load:])
+                del block[self.load:]
+                self._maxes[i] = block[-1]
+                self._maxes.insert(i + 1, self._blocks[i + 1][-1])
+        self._len += 1
+
+    def remove(self, key):
+        i = bisect.bisect_left(self._maxes, key)
+        block = self._blocks[i]
+        del block[bisect.bisect_left(block, key)]
+        if block:
+            self._maxes[i] = block[-1]
+        else:
+            del self._blocks[i]
+            del self._maxes[i]
+        self._len -= 1
+
+    def index(self, key):
+        """Number of keys less than `key`."""
+        i = bisect.bisect_left(self._maxes, key)
+        if i == len(self._blocks):
+            return self._len
+        return sum(len(block) for block in self._blocks[:i]) + bisect.bisect_left(self._blocks[i], key)
+
+    def head(self, k=None):
+        """The first `k` keys (all of them when k is None), in order."""
+        if k is None:
+            return list(self)
+        keys = []
+        for block in self._blocks:
+            if len(keys) >= k:
+                break
+            keys.extend(block[:k - len(keys)])
+        return keys
+
+
+class Leaderboard:
+    """Players of one game kept sorted by score (desc), then joined_at, then address.
+
+    Rank, winner and top-K lookups run over the sorted keys (see SortedKeys)
+    instead of an ORDER BY over the player table on every render.
+    """
+
+    def __init__(self, game_id):
+        self.game_id = game_id
+        self.loaded_at = time.monotonic()
+        self._keys = SortedKeys()
+        self._by_address = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def update(self, ethereum_address, score, joined_at=None):
+        score = score or 0
+        with self._lock:
+            old_key = self._by_address.get(ethereum_address)
+            if old_key is not None:
+                if old_key[0] == -score:
+                    return
+                joined_at = old_key[1]
+                self._keys.remove(old_key)
+            key = (-score, _utc(joined_at), ethereum_address)
+            self._keys.add(key)
+            self._by_address[ethereum_address] = key
+
+    def rank(self, ethereum_address):
+        """1-based rank of a wallet, or None if it is not in this game."""
+        with self._lock:
+            key = self._by_address.get(ethereum_address)
+            if key is None:
+                return None
+            return self._keys.index(key) + 1
+
+    def top(self, k=None):
+        with self._lock:
+            keys = self._keys.head(k)
+        return [LeaderboardEntry(address, -neg_score, joined_at) for neg_score, joined_at, address in keys]
+
+    def winner(self):
+        top = self.top(1)
+        return top[0] if top else None
+
+
+class LeaderboardRegistry:
+    """Process-wide, LRU-bounded map of game_id -> Leaderboard, loaded from the DB on first use.
+
+    Score writes made by this process update its boards directly; writes made by
+    other workers are picked up by reloading a board once it is older than
+    `ttl` seconds, so a board is never more than that stale.
+    """
+
+    def __init__(self, max_games=1000, ttl=5):
+        self.max_games = max_games
+        self.ttl = ttl
+        self._boards = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, game_id):
+        with self._lock:
+            board = self._boards.get(game_id)
+            if board is not None and board.loaded_at + self.ttl > time.monotonic():
+                self._boards.move_to_end(game_id)
+                return board
+
+        board = Leaderboard(game_id)
+        rows = Player.query.filter_by(game_id=game_id).with_entities(
+            Player.ethereum_address, Player.score, Player.joined_at).all()
+        for ethereum_address, score, joined_at in rows:
+            board.update(ethereum_address, score, joined_at)
+
+        with self._lock:
+            current = self._boards.get(game_id)
+            if current is None or current.loaded_at < board.loaded_at:
+                self._boards[game_id] = current = board
+            self._boards.move_to_end(game_id)
+            while len(self._boards) > self.max_games:
+                self._boards.popitem(last=False)
+        return current
+
+    def record_score(self, game_id, ethereum_address, score, joined_at=None):
+        """Keep an already-loaded leaderboard in sync with a score write."""
+        board = self._boards.get(game_id)
+        if board is not None:
+            board.update(ethereum_address, score, joined_at)
+
+    def evict(self, game_id):
+        with self._lock:
+            self._boards.pop(game_id, None)
+
+
+leaderboards = LeaderboardRegistry()
@@ -0,0 +1,202 @@
+import datetime
+import heapq
+import itertools
+import threading
+import time
+from logging import getLogger
+
+from admission import game_admission
+from answers import answer_keys
+from extensions import db, socketio
+from leaderboard import leaderboards
+from models import Game
+from stats import game_statistics
+from submissions import submission_queue
+from versions import game_versions
+from views import PLAY, RESULTS, emit_clock_sync, emit_game_event, emit_phase_change
+
+
+# Initialize logger
+logger = getLogger(__name__)
+
+SYNC = 'sync'
+START = 'start'
+COMPLETE = 'complete'
+
+# Re-broadcast the server clock to a game room this long before it starts,
+# so countdowns that drifted since the page loaded are corrected in time
+CLOCK_SYNC_LEAD = datetime.timedelta(seconds=10)
+
+
+class GameLifecycleScheduler:
+    """Flips has_started / is_complete on pending games exactly when they are due.
+
+    Pending transitions live in a heap keyed by start_time / end_time, so the
+    background greenthread only ever wakes for the next game that needs work
+    instead of scanning the whole game table on every page view.
+
+    Games created or re-timed by another process (another worker, `flask
+    import-games`, direct DB edits) never pass through this worker's
+    schedule(), so every rescan_interval seconds the pending games are re-read
+    and any this worker has not scheduled at their current times are queued.
+    """
+
+    def __init__(self, max_sleep=60, rescan_interval=None):
+        self.app = None
+        self.max_sleep = max_sleep
+        self.rescan_interval = max_sleep if rescan_interval is None else rescan_interval
+        self._heap = []
+        self._counter = itertools.count()  # Tie-breaker so heap entries never compare game ids
+        self._scheduled = {}  # game_id -> (start_time, end_time) its heap entries were queued for
+        self._rescan_at = 0.0  # Monotonic time of the next rescan; the first pass loads everything
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._running = False
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['game_scheduler'] = self
+
+    def start(self):
+        """Start the scheduler greenthread; it loads pending games on its first pass."""
+        if not self._running:
+            self._running = True
+            socketio.start_background_task(self._run)
+
+    def rescan(self):
+        """Queue pending games this worker has not scheduled at their current times; returns how many."""
+        # Only games that still have a transition ahead of them are read
+        games = db.session.query(Game.id, Game.start_time, Game.end_time, Game.time_limit, Game.has_started,
+                                 Game.is_complete).filter_by(is_complete=False).all()
+        queued = 0
+        for game in games:
+            if self._scheduled.get(game.id) != (game.start_time, self._end_time(game)):
+                self.schedule(game)
+                queued += 1
+        # Completed, archived or deleted elsewhere: nothing left to track
+        pending = {game.id for game in games}
+        with self._lock:
+            for game_id in [game_id for game_id in self._scheduled if game_id not in pending]:
+                del self._scheduled[game_id]
+        return queued
+
+    @staticmethod
+    def _end_time(game):
+        if game.end_time is None and game.start_time is not None and game.time_limit:
+            return game.start_time + datetime.timedelta(seconds=game.time_limit)
+        return game.end_time
+
+    def schedule(self, game):
+        """Queue the next transitions for a game. Call after creating or re-timing it."""
+        if game.is_complete or game.start_time is None:
+            return
+        end_time = self._end_time(game)
+
+        with self._lock:
+            self._scheduled[game.id] = (game.start_time, end_time)
+            if not game.has_started:
+                heapq.heappush(self._heap, (game.start_time - CLOCK_SYNC_LEAD, next(self._counter), game.id, SYNC))
+                heapq.heappush(self._heap, (game.start_time, next(self._counter), game.id, START))
+            if end_time is not None:
+                heapq.heappush(self._heap, (end_time, next(self._counter), game.id, COMPLETE))
+        self._wakeup.set()
+
+    def _run(self):
+        loaded = False
+        while True:
+            self._wakeup.clear()
+            if time.monotonic() >= self._rescan_at:
+                self._rescan_at = time.monotonic() + self.rescan_interval
+                with self.app.app_context():
+                    try:
+                        queued = self.rescan()
+                        if not loaded:
+                            logger.info(f"Lifecycle scheduler loaded {queued} pending games")
+                        elif queued:
+                            logger.info(f"Lifecycle scheduler picked up {queued} games created or re-timed elsewhere")
+                        loaded = True
+                    except Exception as e:
+                        logger.error(f"Error loading pending games: {e}")
+                        db.session.rollback()
+            try:
+                delay = self._fire_due()
+            except Exception as e:
+                logger.error(f"Error in lifecycle scheduler: {e}")
+                delay = 1
+            self._wakeup.wait(min(delay, max(self._rescan_at - time.monotonic(), 0)))
+
+    def _fire_due(self):
+        """Apply every transition that is due and return seconds until the next one."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap))
+
+        for _, _, game_id, action in due:
+            with self.app.app_context():
+                try:
+                    self._apply(game_id, action, now)
+                except Exception as e:
+                    logger.error(f"Error updating game ID {game_id}: {e}")
+                    db.session.rollback()
+
+        with self._lock:
+            if not self._heap:
+                return self.max_sleep
+            wait = (self._heap[0][0] - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+        return min(max(wait, 0), self.max_sleep)
+
+    def _apply(self, game_id, action, now):
+        game = db.session.get(Game, game_id)
+        # Stale entries (game ended early, re-timed or deleted) are simply dropped;
+        # schedule() will have pushed a fresh entry for the new time.
+        if game is None or game.is_complete:
+            return
+
+        if action == SYNC:
+            if not game.has_started:
+                emit_clock_sync(game)
+
+        elif action == START:
+            if game.has_started or game.start_time > now:
+                return
+            if not self._claim(game.id, Game.has_started, {'has_started': True}):
+                return
+            game_versions.bump(game.id)
+            emit_game_event('game_started', {'game_id': game.id}, game.id, lobby=True)
+            emit_game_event('game_updated', {'game_id': game.id, 'status': 'started'}, game.id, lobby=True)
+            emit_phase_change(game, PLAY, len(leaderboards.get(game.id)))
+            logger.info(f"Game {game.id} started")
+
+        elif action == COMPLETE:
+            if game.end_time is None and game.time_limit:
+                game.end_time = game.start_time + datetime.timedelta(seconds=game.time_limit)
+            if game.end_time is None or game.end_time > now:
+                return
+            # Persist any scores still buffered before the game is closed
+            submission_queue.flush()
+            if not self._claim(game.id, Game.is_complete,
+                               {'has_started': True, 'is_complete': True, 'end_time': game.end_time}):
+                return
+            with self._lock:
+                self._scheduled.pop(game.id, None)
+            game_statistics.record_game_completed(game)
+            answer_keys.evict(game.id)
+            submission_queue.close(game.id)
+            game_admission.evict(game.id)
+            game_versions.bump(game.id)
+            emit_game_event('game_updated', {'game_id': game.id, 'status': 'completed'}, game.id, lobby=True)
+            emit_phase_change(game, RESULTS, len(leaderboards.get(game.id)))
+            logger.info(f"Game {game.id} completed")
+
+    def _claim(self, game_id, flag, values):
+        # Conditional UPDATE so that when several workers run a scheduler only the
+        # one that actually flips the flag emits the transition to clients
+        claimed = Game.query.filter(Game.id == game_id, flag.isnot(True)).update(
+            values, synchronize_session=False)
+        db.session.commit()
+        return claimed > 0
+
+
+game_scheduler = GameLifecycleScheduler()
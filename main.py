@@ -1,4 +1,11 @@
-from app import app, socketio
+import eventlet
+eventlet.monkey_patch()
+
+from app import create_app, start_background_tasks  # noqa: E402
+from extensions import socketio  # noqa: E402
+
+app = create_app()
 
 if __name__ == "__main__":
+    start_background_tasks(app)
     socketio.run(app, host="0.0.0.0", port=5000, debug=True)
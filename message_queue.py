@@ -0,0 +1,114 @@
+import glob
+import json
+import os
+import socket
+import sys
+from logging import getLogger
+from urllib.parse import urlparse
+
+import socketio as python_socketio
+
+
+# Initialize logger
+logger = getLogger(__name__)
+
+LOCAL_SCHEME = 'local'
+MAX_MESSAGE_SIZE = 212992  # Default Linux datagram buffer; events here are far smaller
+
+
+class LocalSocketManager(python_socketio.PubSubManager):
+    """Socket.IO pub/sub backend over Unix datagram sockets on one machine.
+
+    Every worker binds `<directory>/<channel>/<host_id>.sock` and publishes by
+    sending the message to every socket in that directory, so several eventlet
+    workers on one host can share rooms and emits without an external broker.
+    Sockets left behind by dead workers are removed on the first failed send.
+
+        SOCKETIO_MESSAGE_QUEUE=local:///tmp/wtw-socketio
+    """
+    name = 'localsocket'
+
+    def __init__(self, url='local:///tmp/wtw-socketio', channel='socketio', write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.directory = os.path.join(urlparse(url).path or '/tmp/wtw-socketio', channel)
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = None
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        if not write_only:
+            self.path = os.path.join(self.directory, f'{self.host_id}.sock')
+            self.sock.bind(self.path)
+
+    def _publish(self, data):
+        message = json.dumps(data).encode('utf-8')
+        if len(message) > MAX_MESSAGE_SIZE:
+            logger.error(f"Dropping {len(message)} byte Socket.IO message: larger than {MAX_MESSAGE_SIZE}")
+            return
+        # Every host, including this one, receives the message through its socket
+        for peer in glob.glob(os.path.join(self.directory, '*.sock')):
+            try:
+                self.sock.sendto(message, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                self._remove_stale(peer)
+            except OSError as e:
+                logger.error(f"Error publishing to {peer}: {e}")
+
+    def _listen(self):
+        while True:
+            data = self.sock.recv(MAX_MESSAGE_SIZE)
+            try:
+                yield json.loads(data.decode('utf-8'))
+            except ValueError:
+                logger.error("Discarding malformed Socket.IO queue message")
+
+    def _remove_stale(self, peer):
+        if peer == self.path:
+            return
+        try:
+            os.unlink(peer)
+        except OSError:
+            pass
+
+
+def default_async_mode():
+    """eventlet in serving processes, threading everywhere else.
+
+    Servers monkey-patch eventlet before importing the app (`python app.py`,
+    main.py, the eventlet worker class); CLI commands and scripts don't, and
+    then skip the cost of importing eventlet altogether.
+    """
+    eventlet = sys.modules.get('eventlet')
+    if eventlet is not None and eventlet.patcher.is_monkey_patched('socket'):
+        return 'eventlet'
+    return 'threading'
+
+
+def socketio_options(config):
+    """Build the SocketIO.init_app keyword arguments for the configured deployment.
+
+    SOCKETIO_MESSAGE_QUEUE selects the cross-process backend:
+      - unset:                   single process, in-memory (development)
+      - local:///path/to/dir     LocalSocketManager, N workers on one machine
+      - redis://, amqp://, ...   Flask-SocketIO's built-in Redis / Kombu managers
+    SOCKETIO_TRANSPORTS=websocket drops long-polling so no sticky sessions are
+    needed behind a load balancer; otherwise SOCKETIO_COOKIE names the
+    Engine.IO session cookie the balancer can pin on. SOCKETIO_ASYNC_MODE
+    overrides default_async_mode.
+    """
+    options = {'async_mode': config.get('SOCKETIO_ASYNC_MODE') or default_async_mode()}
+    channel = config.get('SOCKETIO_CHANNEL', 'wtw-socketio')
+
+    message_queue = config.get('SOCKETIO_MESSAGE_QUEUE')
+    if message_queue:
+        if urlparse(message_queue).scheme == LOCAL_SCHEME:
+            options['client_manager'] = LocalSocketManager(message_queue, channel=channel)
+        else:
+            options['message_queue'] = message_queue
+            options['channel'] = channel
+
+    transports = config.get('SOCKETIO_TRANSPORTS')
+    if transports:
+        options['transports'] = [t.strip() for t in transports.split(',') if t.strip()]
+    if config.get('SOCKETIO_COOKIE'):
+        options['cookie'] = config['SOCKETIO_COOKIE']
+
+    return options
@@ -0,0 +1,281 @@
+import bisect
+import threading
+import time
+from logging import getLogger
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+
+from extensions import db, socketio
+
+
+# Initialize logger
+logger = getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+FANOUT_BUCKETS = (0, 1, 10, 100, 1000, 10000)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(labels.get(name, '') for name in self.label_names)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value):
+        return [f'{self.name}{_format_labels(self.label_names, key)} {value}']
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [[0] * len(self.buckets), 0, 0.0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                counts[0][index] += 1
+            counts[1] += 1
+            counts[2] += value
+
+    def _render_value(self, key, value):
+        bucket_counts, count, total = value
+        lines, cumulative = [], 0
+        for bound, bucket_count in zip(self.buckets, bucket_counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.label_names, key, [('le', bound)])
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _format_labels(self.label_names, key, [('le', '+Inf')])
+        lines.append(f'{self.name}_bucket{labels} {count}')
+        lines.append(f'{self.name}_count{_format_labels(self.label_names, key)} {count}')
+        lines.append(f'{self.name}_sum{_format_labels(self.label_names, key)} {total}')
+        return lines
+
+
+class Instrumentation:
+    """Request, query, Socket.IO emit and event loop metrics in Prometheus text format.
+
+    Served on /metrics. With SLOW_REQUEST_MS set, requests slower than that are
+    logged together with every SQL statement they ran.
+    """
+
+    def __init__(self, hub_sample_interval=1.0):
+        self.app = None
+        self.hub_sample_interval = hub_sample_interval
+        self.slow_request_ms = None
+        self.collectors = []
+        self._sampling = False
+
+        self.requests = Histogram('wtw_http_request_duration_seconds', 'HTTP request latency.',
+                                  ['method', 'endpoint', 'status'])
+        self.request_queries = Histogram('wtw_http_request_db_queries', 'SQL statements executed per request.',
+                                         ['endpoint'], buckets=QUERY_COUNT_BUCKETS)
+        self.request_query_time = Histogram('wtw_http_request_db_seconds', 'Time spent in SQL per request.',
+                                            ['endpoint'])
+        self.queries = Counter('wtw_db_queries_total', 'SQL statements executed.', ['source'])
+        self.query_time = Counter('wtw_db_query_seconds_total', 'Time spent executing SQL.', ['source'])
+        self.emits = Counter('wtw_socketio_emits_total', 'Socket.IO events emitted.', ['namespace', 'event'])
+        self.emit_latency = Histogram('wtw_socketio_emit_seconds', 'Time to fan an emit out to its recipients.',
+                                      ['namespace'])
+        self.emit_fanout = Histogram('wtw_socketio_emit_recipients', 'Local clients reached per emit.',
+                                     ['namespace'], buckets=FANOUT_BUCKETS)
+        self.hub_timers = Gauge('wtw_eventlet_hub_timers', 'Timers scheduled on the eventlet hub.')
+        self.hub_listeners = Gauge('wtw_eventlet_hub_listeners', 'File descriptors the eventlet hub waits on.',
+                                   ['mode'])
+        self.hub_lag = Histogram('wtw_eventlet_hub_lag_seconds',
+                                 'How late a sleeping greenthread is woken; grows when the hub is saturated.')
+        self._metrics = [self.requests, self.request_queries, self.request_query_time, self.queries,
+                         self.query_time, self.emits, self.emit_latency, self.emit_fanout, self.hub_timers,
+                         self.hub_listeners, self.hub_lag]
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['metrics'] = self
+        self.slow_request_ms = app.config.get('SLOW_REQUEST_MS')
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule('/metrics', 'metrics', self.render_response)
+
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(db.engine, 'after_cursor_execute', self._after_cursor_execute)
+
+        self._instrument_socketio()
+
+    def start(self):
+        if not self._sampling:
+            self._sampling = True
+            socketio.start_background_task(self._sample_hub)
+
+    def add_collector(self, collector):
+        """Register a callable returning extra exposition lines, rendered on every scrape.
+
+        Registering the same collector again (create_app run twice) is a no-op.
+        """
+        if collector not in self.collectors:
+            self.collectors.append(collector)
+
+    # HTTP requests
+
+    def _before_request(self):
+        g.metrics_started = time.perf_counter()
+        g.metrics_queries = []
+
+    def _after_request(self, response):
+        started = g.get('metrics_started')
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = request.endpoint or 'unmatched'
+        queries = g.get('metrics_queries', [])
+        query_time = sum(duration for _, duration in queries)
+
+        self.requests.observe(elapsed, method=request.method, endpoint=endpoint, status=response.status_code)
+        self.request_queries.observe(len(queries), endpoint=endpoint)
+        self.request_query_time.observe(query_time, endpoint=endpoint)
+
+        if self.slow_request_ms is not None and elapsed * 1000 >= float(self.slow_request_ms):
+            statements = '\n'.join(f'  {duration * 1000:8.2f} ms  {statement}' for statement, duration in queries)
+            logger.warning(f"Slow request {request.method} {request.path} -> {response.status_code}: "
+                           f"{elapsed * 1000:.1f} ms, {len(queries)} queries ({query_time * 1000:.1f} ms)\n"
+                           f"{statements}")
+        return response
+
+    # SQL
+
+    # The start time lives on the execution context rather than a stack in conn.info: a
+    # statement that raises never reaches after_cursor_execute, and a stack entry left behind
+    # would mis-time every later statement on that connection
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context.metrics_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, 'metrics_started', None)
+        if started is None:
+            return
+        duration = time.perf_counter() - started
+        in_request = has_request_context()
+        source = 'request' if in_request else 'background'
+        self.queries.inc(source=source)
+        self.query_time.inc(duration, source=source)
+        if in_request:
+            queries = g.get('metrics_queries')
+            if queries is not None:
+                queries.append((' '.join(statement.split()), duration))
+
+    # Socket.IO
+
+    def _instrument_socketio(self):
+        manager = socketio.server.manager
+        emit = manager.emit
+
+        def timed_emit(event, data, namespace=None, room=None, *args, **kwargs):
+            namespace = namespace or '/'
+            started = time.perf_counter()
+            result = emit(event, data, namespace, room, *args, **kwargs)
+            self.emit_latency.observe(time.perf_counter() - started, namespace=namespace)
+            self.emits.inc(namespace=namespace, event=event)
+            self.emit_fanout.observe(self._room_size(manager, namespace, room), namespace=namespace)
+            return result
+
+        manager.emit = timed_emit
+
+    @staticmethod
+    def _room_size(manager, namespace, room):
+        rooms = manager.rooms.get(namespace, {})
+        if room is None:
+            return len(rooms.get(None, ()))
+        if isinstance(room, (list, tuple, set)):
+            return sum(len(rooms.get(r, ())) for r in room)
+        return len(rooms.get(room, ()))
+
+    # Event loop
+
+    def _sample_hub(self):
+        while True:
+            started = time.perf_counter()
+            socketio.sleep(self.hub_sample_interval)
+            self.hub_lag.observe(max(0.0, time.perf_counter() - started - self.hub_sample_interval))
+
+    def _update_hub_gauges(self):
+        if socketio.async_mode != 'eventlet':
+            return
+        from eventlet import hubs
+        hub = hubs.get_hub()
+        self.hub_timers.set(len(hub.timers) + len(hub.next_timers))
+        self.hub_listeners.set(len(hub.get_readers()), mode='read')
+        self.hub_listeners.set(len(hub.get_writers()), mode='write')
+
+    # Exposition
+
+    def render(self):
+        self._update_hub_gauges()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self.collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                logger.error(f"Error collecting metrics: {e}")
+        return '\n'.join(lines) + '\n'
+
+    def render_response(self):
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+
+metrics = Instrumentation()
@@ -0,0 +1,34 @@
+"""Add indexes for hot query shapes on game, player and question
+
+Revision ID: 3d0c9e27d56d
+Revises: 706b19af7a62
+Create Date: 2026-10-17 09:12:41.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d0c9e27d56d'
+down_revision = '706b19af7a62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Index listing and lifecycle scheduler: WHERE is_complete = false ORDER BY start_time
+    op.create_index('ix_game_is_complete_start_time', 'game', ['is_complete', 'start_time'], unique=False)
+    # Admin dashboard: ORDER BY created_at DESC
+    op.create_index('ix_game_created_at', 'game', ['created_at'], unique=False)
+    # Leaderboards: WHERE game_id = ? ORDER BY score DESC, joined_at
+    op.create_index('ix_player_game_score_joined', 'player', ['game_id', sa.text('score DESC'), 'joined_at'], unique=False)
+    # Answer keys and play page: WHERE game_id = ? ORDER BY id
+    op.create_index('ix_question_game_id', 'question', ['game_id', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_question_game_id', table_name='question')
+    op.drop_index('ix_player_game_score_joined', table_name='player')
+    op.drop_index('ix_game_created_at', table_name='game')
+    op.drop_index('ix_game_is_complete_start_time', table_name='game')
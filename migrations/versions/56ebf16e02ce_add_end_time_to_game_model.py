@@ -1,7 +1,7 @@
 """Add end_time to Game Model
 
 Revision ID: 56ebf16e02ce
-Revises: 
+Revises: b5e0a7d3c912
 Create Date: 2024-10-03 15:09:50.503594
 
 """
@@ -11,12 +11,16 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision = '56ebf16e02ce'
-down_revision = None
+down_revision = 'b5e0a7d3c912'
 branch_labels = None
 depends_on = None
 
 
 def upgrade():
+    # Databases built by the old db.create_all() at startup already have the column
+    if 'end_time' in {column['name'] for column in sa.inspect(op.get_bind()).get_columns('game')}:
+        return
+
     # ### commands auto generated by Alembic - please adjust! ###
     with op.batch_alter_table('game', schema=None) as batch_op:
         batch_op.add_column(sa.Column('end_time', sa.DateTime(), nullable=True))
@@ -17,6 +17,10 @@ depends_on = None
 
 
 def upgrade():
+    # Databases built by the old db.create_all() at startup already have the column
+    if 'has_started' in {column['name'] for column in sa.inspect(op.get_bind()).get_columns('game')}:
+        return
+
     # ### commands auto generated by Alembic - please adjust! ###
     with op.batch_alter_table('game', schema=None) as batch_op:
         batch_op.add_column(sa.Column('has_started', sa.Boolean(), nullable=True))
@@ -0,0 +1,59 @@
+"""Backfill game.end_time and store end_time as a timezone-aware column
+
+Revision ID: 9a926a7e5d21
+Revises: 3d0c9e27d56d
+Create Date: 2026-10-17 11:40:07.562913
+
+"""
+import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a926a7e5d21'
+down_revision = '3d0c9e27d56d'
+branch_labels = None
+depends_on = None
+
+
+game = sa.table(
+    'game',
+    sa.column('id', sa.Integer),
+    sa.column('start_time', sa.DateTime(timezone=True)),
+    sa.column('end_time', sa.DateTime(timezone=True)),
+    sa.column('time_limit', sa.Integer),
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    # 56ebf16e02ce added end_time without a time zone; make it match start_time on Postgres.
+    # Columns made by db.create_all() are timezone-aware already and must not be converted twice.
+    end_time_type = next(column['type'] for column in sa.inspect(bind).get_columns('game')
+                         if column['name'] == 'end_time')
+    if bind.dialect.name == 'postgresql' and not getattr(end_time_type, 'timezone', False):
+        op.execute("ALTER TABLE game ALTER COLUMN end_time TYPE TIMESTAMP WITH TIME ZONE "
+                   "USING end_time AT TIME ZONE 'UTC'")
+
+    # Games created before end_time existed had it recomputed on every request; store it once
+    rows = bind.execute(
+        sa.select(game.c.id, game.c.start_time, game.c.time_limit)
+        .where(game.c.end_time.is_(None), game.c.start_time.isnot(None), game.c.time_limit.isnot(None))
+    ).fetchall()
+    for game_id, start_time, time_limit in rows:
+        if start_time.tzinfo is None:
+            start_time = start_time.replace(tzinfo=datetime.timezone.utc)
+        bind.execute(
+            game.update().where(game.c.id == game_id)
+            .values(end_time=start_time + datetime.timedelta(seconds=time_limit))
+        )
+
+
+def downgrade():
+    # The backfilled end_time values are kept; only the column type is reverted
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TABLE game ALTER COLUMN end_time TYPE TIMESTAMP WITHOUT TIME ZONE "
+                   "USING end_time AT TIME ZONE 'UTC'")
@@ -0,0 +1,79 @@
+"""Create the initial game, player, question and admin tables
+
+Revision ID: b5e0a7d3c912
+Revises: 
+Create Date: 2026-10-17 18:41:37.206553
+
+The app used to create these with db.create_all() at import time, so older
+databases already have them; they are only created when missing. Such a
+database has no alembic_version row; `flask db upgrade` brings it to head
+directly, since 56ebf16e02ce and 706b19af7a62 skip the columns create_all
+already made. Databases stamped at 56ebf16e02ce or 706b19af7a62 upgrade as
+before; this revision was inserted beneath them as the new root.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e0a7d3c912'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    # Shapes as of the first migration; later revisions add columns and indexes
+    if 'game' not in existing:
+        op.create_table(
+            'game',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('time_limit', sa.Integer(), nullable=False),
+            sa.Column('max_players', sa.Integer(), nullable=False),
+            sa.Column('pot_size', sa.Float(), nullable=False),
+            sa.Column('entry_value', sa.Float(), nullable=False),
+            sa.Column('start_time', sa.DateTime(), nullable=False),
+            sa.Column('is_complete', sa.Boolean(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+        )
+    if 'player' not in existing:
+        op.create_table(
+            'player',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('game_id', sa.Integer(), nullable=False),
+            sa.Column('ethereum_address', sa.String(length=42), nullable=False),
+            sa.Column('score', sa.Integer(), nullable=True),
+            sa.Column('joined_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['game_id'], ['game.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('game_id', 'ethereum_address', name='_game_ethereum_uc'),
+        )
+    if 'question' not in existing:
+        op.create_table(
+            'question',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('game_id', sa.Integer(), nullable=False),
+            sa.Column('phrase', sa.String(length=255), nullable=False),
+            sa.Column('answer', sa.String(length=255), nullable=False),
+            sa.ForeignKeyConstraint(['game_id'], ['game.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+    if 'admin' not in existing:
+        op.create_table(
+            'admin',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('username', sa.String(length=80), nullable=False),
+            sa.Column('password_hash', sa.String(length=128), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('username'),
+        )
+
+
+def downgrade():
+    op.drop_table('admin')
+    op.drop_table('question')
+    op.drop_table('player')
+    op.drop_table('game')
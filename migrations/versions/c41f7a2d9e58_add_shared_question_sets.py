@@ -0,0 +1,118 @@
+"""Add content-hashed question sets shared across games
+
+Revision ID: c41f7a2d9e58
+Revises: 9a926a7e5d21
+Create Date: 2026-10-17 15:02:19.274611
+
+"""
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41f7a2d9e58'
+down_revision = '9a926a7e5d21'
+branch_labels = None
+depends_on = None
+
+
+game = sa.table(
+    'game',
+    sa.column('id', sa.Integer),
+    sa.column('question_set_id', sa.Integer),
+)
+
+question = sa.table(
+    'question',
+    sa.column('id', sa.Integer),
+    sa.column('game_id', sa.Integer),
+    sa.column('question_set_id', sa.Integer),
+    sa.column('phrase', sa.String),
+    sa.column('answer', sa.String),
+)
+
+question_set = sa.table(
+    'question_set',
+    sa.column('id', sa.Integer),
+    sa.column('content_hash', sa.String),
+)
+
+
+def _content_hash(rows):
+    # Must match question_bank.question_set_hash
+    digest = hashlib.sha256()
+    for phrase, answer in rows:
+        digest.update(phrase.encode('utf-8') + b'\x1f' + answer.encode('utf-8') + b'\x1e')
+    return digest.hexdigest()
+
+
+def upgrade():
+    op.create_table(
+        'question_set',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('content_hash'),
+    )
+    with op.batch_alter_table('question') as batch_op:
+        batch_op.add_column(sa.Column('question_set_id', sa.Integer(), nullable=True))
+        batch_op.alter_column('game_id', existing_type=sa.Integer(), nullable=True)
+        batch_op.create_foreign_key('fk_question_question_set_id', 'question_set', ['question_set_id'], ['id'])
+        batch_op.create_index('ix_question_question_set_id', ['question_set_id', 'id'], unique=False)
+    with op.batch_alter_table('game') as batch_op:
+        batch_op.add_column(sa.Column('question_set_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_game_question_set_id', 'question_set', ['question_set_id'], ['id'])
+
+    # Fold every game's own questions into shared sets: identical sets are stored once
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(question.c.game_id, question.c.phrase, question.c.answer)
+        .where(question.c.game_id.isnot(None))
+        .order_by(question.c.game_id, question.c.id)
+    ).fetchall()
+    by_game = {}
+    for game_id, phrase, answer in rows:
+        by_game.setdefault(game_id, []).append((phrase, answer))
+
+    set_ids = {}
+    for game_id, questions in by_game.items():
+        content_hash = _content_hash(questions)
+        if content_hash not in set_ids:
+            set_id = bind.execute(
+                sa.select(question_set.c.id).where(question_set.c.content_hash == content_hash)).scalar()
+            if set_id is None:
+                bind.execute(question_set.insert().values(content_hash=content_hash))
+                set_id = bind.execute(
+                    sa.select(question_set.c.id).where(question_set.c.content_hash == content_hash)).scalar()
+                bind.execute(question.insert(), [{'question_set_id': set_id, 'phrase': phrase, 'answer': answer}
+                                                 for phrase, answer in questions])
+            set_ids[content_hash] = set_id
+        bind.execute(game.update().where(game.c.id == game_id).values(question_set_id=set_ids[content_hash]))
+    bind.execute(question.delete().where(question.c.game_id.isnot(None)))
+
+
+def downgrade():
+    # Give every game its own copy of its set's questions again
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(game.c.id, question.c.phrase, question.c.answer)
+        .select_from(game.join(question, question.c.question_set_id == game.c.question_set_id))
+        .order_by(game.c.id, question.c.id)
+    ).fetchall()
+    if rows:
+        bind.execute(question.insert(), [{'game_id': game_id, 'phrase': phrase, 'answer': answer}
+                                         for game_id, phrase, answer in rows])
+    bind.execute(question.delete().where(question.c.game_id.is_(None)))
+
+    with op.batch_alter_table('game') as batch_op:
+        batch_op.drop_constraint('fk_game_question_set_id', type_='foreignkey')
+        batch_op.drop_column('question_set_id')
+    with op.batch_alter_table('question') as batch_op:
+        batch_op.drop_index('ix_question_question_set_id')
+        batch_op.drop_constraint('fk_question_question_set_id', type_='foreignkey')
+        batch_op.alter_column('game_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_column('question_set_id')
+    op.drop_table('question_set')
@@ -0,0 +1,55 @@
+"""Add archive tables for completed games
+
+Revision ID: e7b3d95a0c14
+Revises: c41f7a2d9e58
+Create Date: 2026-10-17 17:26:08.530917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b3d95a0c14'
+down_revision = 'c41f7a2d9e58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'archived_game',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('time_limit', sa.Integer(), nullable=False),
+        sa.Column('max_players', sa.Integer(), nullable=False),
+        sa.Column('pot_size', sa.Float(), nullable=False),
+        sa.Column('entry_value', sa.Float(), nullable=False),
+        sa.Column('start_time', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('end_time', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('question_set_id', sa.Integer(), nullable=True),
+        sa.Column('player_count', sa.Integer(), nullable=False),
+        sa.Column('winner_address', sa.String(length=42), nullable=True),
+        sa.Column('winner_score', sa.Integer(), nullable=True),
+        sa.Column('payload', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['question_set_id'], ['question_set.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    archive_totals = op.create_table(
+        'archive_totals',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('games', sa.Integer(), nullable=False),
+        sa.Column('rewards', sa.Float(), nullable=False),
+        sa.Column('players', sa.Integer(), nullable=False),
+        sa.Column('time', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    # The single totals row exists from the start, so archiving workers only ever UPDATE it
+    op.bulk_insert(archive_totals, [{'id': 1, 'games': 0, 'rewards': 0, 'players': 0, 'time': 0}])
+
+
+def downgrade():
+    # Archived games are not moved back into game / player; downgrading discards them
+    op.drop_table('archive_totals')
+    op.drop_table('archived_game')
@@ -0,0 +1,118 @@
+"""Merge players whose addresses differ only in case and store addresses lowercase
+
+Revision ID: f2a8c61d4b97
+Revises: e7b3d95a0c14
+Create Date: 2026-10-18 09:12:44.201736
+
+"""
+import json
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a8c61d4b97'
+down_revision = 'e7b3d95a0c14'
+branch_labels = None
+depends_on = None
+
+
+player = sa.table(
+    'player',
+    sa.column('id', sa.Integer),
+    sa.column('game_id', sa.Integer),
+    sa.column('ethereum_address', sa.String),
+    sa.column('score', sa.Integer),
+    sa.column('joined_at', sa.DateTime(timezone=True)),
+)
+
+archived_game = sa.table(
+    'archived_game',
+    sa.column('id', sa.Integer),
+    sa.column('player_count', sa.Integer),
+    sa.column('winner_address', sa.String),
+    sa.column('winner_score', sa.Integer),
+    sa.column('payload', sa.LargeBinary),
+)
+
+BATCH_SIZE = 500
+
+
+def _lowercase_payload(payload):
+    """Archived payload (see archive.encode_payload) with lowercase, merged players; None if unchanged."""
+    data = json.loads(zlib.decompress(payload).decode('utf-8'))
+    if all(address == address.lower() for address, _, _ in data['players']):
+        return None
+    merged = {}
+    for address, score, joined_at in data['players']:
+        address = address.lower()
+        if address in merged:
+            best, earliest = merged[address]
+            joined = [value for value in (earliest, joined_at) if value is not None]
+            merged[address] = (max(best or 0, score or 0), min(joined) if joined else None)
+        else:
+            merged[address] = (score, joined_at)
+    # Same order as the leaderboard: score desc, joined_at, address (ISO strings sort as times)
+    data['players'] = sorted(([address, score, joined_at] for address, (score, joined_at) in merged.items()),
+                             key=lambda player: (-(player[1] or 0), player[2] is None, player[2] or '', player[0]))
+    return data['players'], zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'), 9)
+
+
+def upgrade():
+    bind = op.get_bind()
+    lowered = sa.func.lower(player.c.ethereum_address)
+
+    # `0xABC…` and `0xabc…` in one game were two players; fold each group into one row
+    duplicates = bind.execute(
+        sa.select(player.c.game_id, lowered)
+        .group_by(player.c.game_id, lowered)
+        .having(sa.func.count() > 1)
+    ).fetchall()
+    for game_id, address in duplicates:
+        rows = bind.execute(
+            sa.select(player.c.id, player.c.score, player.c.joined_at)
+            .where(player.c.game_id == game_id, lowered == address)
+            .order_by(player.c.id)
+        ).fetchall()
+        # The merged player keeps the best score and the earliest join
+        keeper = min(rows, key=lambda row: (-(row.score or 0), row.id))
+        joined = [row.joined_at for row in rows if row.joined_at is not None]
+        bind.execute(
+            player.delete().where(player.c.id.in_([row.id for row in rows if row.id != keeper.id]))
+        )
+        bind.execute(
+            player.update().where(player.c.id == keeper.id)
+            .values(ethereum_address=address, score=max(row.score or 0 for row in rows),
+                    joined_at=min(joined) if joined else None)
+        )
+
+    bind.execute(player.update().where(player.c.ethereum_address != lowered).values(ethereum_address=lowered))
+
+    # Archived leaderboards get the same treatment inside their compressed payloads
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(archived_game.c.id, archived_game.c.payload)
+            .where(archived_game.c.id > last_id).order_by(archived_game.c.id).limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        for row in rows:
+            rewritten = _lowercase_payload(row.payload)
+            if rewritten is None:
+                continue
+            players, payload = rewritten
+            winner = players[0] if players else (None, None, None)
+            bind.execute(
+                archived_game.update().where(archived_game.c.id == row.id)
+                .values(payload=payload, player_count=len(players), winner_address=winner[0],
+                        winner_score=winner[1])
+            )
+
+
+def downgrade():
+    # Merged players cannot be split again and the original casing is not kept; nothing to undo
+    pass
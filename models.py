@@ -1,10 +1,34 @@
 from extensions import db
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, event
+from sqlalchemy.types import TypeDecorator
+
+class UTCDateTime(TypeDecorator):
+    """DateTime column that always stores UTC and always loads timezone-aware UTC values.
+
+    Naive values are treated as UTC on the way in and on the way out (SQLite drops tzinfo).
+    """
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None:
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            value = value.astimezone(timezone.utc)
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is not None:
+            if value.tzinfo is None:
+                return value.replace(tzinfo=timezone.utc)
+            return value.astimezone(timezone.utc)
+        return value
+
 
 def get_current_utc_time():
     """Returns the current UTC time as a timezone-aware datetime object."""
-    return datetime.utcnow().replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc)
 
 
 # Game Model
@@ -14,15 +38,24 @@ class Game(db.Model):
     max_players = db.Column(db.Integer, nullable=False)
     pot_size = db.Column(db.Float, nullable=False)
     entry_value = db.Column(db.Float, nullable=False)
-    start_time = db.Column(db.DateTime(timezone=True), nullable=False)
-    end_time = db.Column(db.DateTime(timezone=True))
+    start_time = db.Column(UTCDateTime, nullable=False)
+    end_time = db.Column(UTCDateTime)
     is_complete = db.Column(db.Boolean, default=False)
     has_started = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime(timezone=True), default=get_current_utc_time)
+    created_at = db.Column(UTCDateTime, default=get_current_utc_time)
+    # Shared question bank entry; games created before banks existed keep their own Question rows
+    question_set_id = db.Column(db.Integer, db.ForeignKey('question_set.id'), nullable=True)
 
     # Relationships
     players = db.relationship('Player', back_populates='game', lazy=True)
     questions = db.relationship('Question', back_populates='game', lazy=True)
+    question_set = db.relationship('QuestionSet', back_populates='games')
+
+    # Indexes for the index listing / lifecycle scheduler and the admin dashboard ordering
+    __table_args__ = (
+        db.Index('ix_game_is_complete_start_time', 'is_complete', 'start_time'),
+        db.Index('ix_game_created_at', 'created_at'),
+    )
 
     def __repr__(self):
         return f'<Game {self.id}, Start Time: {self.start_time}, Complete: {self.is_complete}>'
@@ -33,29 +66,99 @@ class Player(db.Model):
     game_id = db.Column(db.Integer, db.ForeignKey('game.id'), nullable=False)
     ethereum_address = db.Column(db.String(42), nullable=False)
     score = db.Column(db.Integer, default=0)
-    joined_at = db.Column(db.DateTime(timezone=True), default=get_current_utc_time)  # Added timezone=True
+    joined_at = db.Column(UTCDateTime, default=get_current_utc_time)
 
     # Relationship with Game model
     game = db.relationship('Game', back_populates='players')
 
     # Unique constraint to prevent the same player from joining the same game twice
-    __table_args__ = (db.UniqueConstraint('game_id', 'ethereum_address', name='_game_ethereum_uc'),)
+    # Leaderboard index matches ORDER BY score DESC, joined_at within a game
+    __table_args__ = (
+        db.UniqueConstraint('game_id', 'ethereum_address', name='_game_ethereum_uc'),
+        db.Index('ix_player_game_score_joined', 'game_id', score.desc(), 'joined_at'),
+    )
 
     def __repr__(self):
         return f'<Player {self.ethereum_address} in Game {self.game_id}, Score: {self.score}>'
 
+# Question Set Model
+class QuestionSet(db.Model):
+    """Immutable question set identified by the hash of its content, shared by every game using it."""
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), unique=True, nullable=False)
+    created_at = db.Column(UTCDateTime, default=get_current_utc_time)
+
+    # Relationships
+    games = db.relationship('Game', back_populates='question_set', lazy=True)
+    questions = db.relationship('Question', back_populates='question_set', lazy=True, order_by='Question.id')
+
+    def __repr__(self):
+        return f'<QuestionSet {self.id}, Hash: {self.content_hash[:12]}>'
+
 # Question Model
 class Question(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    game_id = db.Column(db.Integer, db.ForeignKey('game.id'), nullable=False)
+    # Exactly one of game_id (legacy per-game copy) or question_set_id (shared bank) is set
+    game_id = db.Column(db.Integer, db.ForeignKey('game.id'), nullable=True)
+    question_set_id = db.Column(db.Integer, db.ForeignKey('question_set.id'), nullable=True)
     phrase = db.Column(db.String(255), nullable=False)
     answer = db.Column(db.String(255), nullable=False)
 
-    # Relationship with Game model
+    # Relationships
     game = db.relationship('Game', back_populates='questions')
+    question_set = db.relationship('QuestionSet', back_populates='questions')
+
+    __table_args__ = (
+        db.Index('ix_question_game_id', 'game_id', 'id'),
+        db.Index('ix_question_question_set_id', 'question_set_id', 'id'),
+    )
 
     def __repr__(self):
-        return f'<Question {self.id}, Game: {self.game_id}>'
+        return f'<Question {self.id}, Game: {self.game_id}, Set: {self.question_set_id}>'
+
+# Archived Game Model
+class ArchivedGame(db.Model):
+    """A completed game moved out of the hot tables by archive.GameArchiver.
+
+    Keeps the game's columns and its result; the full leaderboard (and, for games
+    predating question sets, their own questions) is a zlib-compressed JSON blob
+    that is only decoded when an admin opens the game.
+    """
+    id = db.Column(db.Integer, primary_key=True)  # Same id the game had in `game`
+    time_limit = db.Column(db.Integer, nullable=False)
+    max_players = db.Column(db.Integer, nullable=False)
+    pot_size = db.Column(db.Float, nullable=False)
+    entry_value = db.Column(db.Float, nullable=False)
+    start_time = db.Column(UTCDateTime, nullable=False)
+    end_time = db.Column(UTCDateTime)
+    created_at = db.Column(UTCDateTime)
+    archived_at = db.Column(UTCDateTime, default=get_current_utc_time)
+    question_set_id = db.Column(db.Integer, db.ForeignKey('question_set.id'), nullable=True)
+    player_count = db.Column(db.Integer, nullable=False, default=0)
+    winner_address = db.Column(db.String(42))
+    winner_score = db.Column(db.Integer)
+    payload = db.Column(db.LargeBinary, nullable=False)
+
+    def __repr__(self):
+        return f'<ArchivedGame {self.id}, Players: {self.player_count}, Winner: {self.winner_address}>'
+
+# Archive Totals Model
+class ArchiveTotals(db.Model):
+    """Single row of running totals over every archived game, so global statistics stay correct."""
+    id = db.Column(db.Integer, primary_key=True)
+    games = db.Column(db.Integer, nullable=False, default=0)
+    rewards = db.Column(db.Float, nullable=False, default=0)
+    players = db.Column(db.Integer, nullable=False, default=0)
+    time = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ArchiveTotals Games: {self.games}, Players: {self.players}>'
+
+
+@event.listens_for(ArchiveTotals.__table__, 'after_create')
+def seed_archive_totals(table, connection, **kwargs):
+    # db.create_all() databases get the single row too; migration e7b3d95a0c14 seeds it otherwise
+    connection.execute(table.insert().values(id=1, games=0, rewards=0, players=0, time=0))
 
 # Admin Model
 class Admin(db.Model):
@@ -0,0 +1,104 @@
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from logging import getLogger
+
+from extensions import db
+from models import Question, QuestionSet
+
+
+# Initialize logger
+logger = getLogger(__name__)
+
+QuestionSpec = namedtuple('QuestionSpec', ['phrase', 'answer'])
+BankQuestion = namedtuple('BankQuestion', ['id', 'phrase', 'answer'])
+
+
+def question_set_hash(questions):
+    """Content hash of an ordered list of (phrase, answer) questions."""
+    digest = hashlib.sha256()
+    for question in questions:
+        digest.update(question.phrase.encode('utf-8') + b'\x1f' + question.answer.encode('utf-8') + b'\x1e')
+    return digest.hexdigest()
+
+
+class QuestionBank:
+    """Content-addressed question sets, stored once and cached once per process.
+
+    A game references a QuestionSet instead of owning Question rows, so running
+    the same phrases in 50 games writes and caches them once. Sets are never
+    modified after creation, so cached entries never go stale.
+    """
+
+    def __init__(self, max_sets=5000):
+        self.max_sets = max_sets
+        self._sets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, questions):
+        """Return the id of the set holding exactly these questions, inserting it if new.
+
+        Runs inside the caller's transaction and does not commit.
+        """
+        questions = [QuestionSpec(q.phrase, q.answer) for q in questions]
+        content_hash = question_set_hash(questions)
+        question_set_id = self._find(content_hash)
+        if question_set_id is not None:
+            return question_set_id
+
+        dialect = db.engine.dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            insert = None
+
+        if insert is not None:
+            # Another worker may be creating the same set; the unique hash makes that a no-op
+            result = db.session.execute(insert(QuestionSet.__table__).values(content_hash=content_hash)
+                                        .on_conflict_do_nothing(index_elements=['content_hash']))
+            if not result.rowcount:
+                return self._find(content_hash)
+            question_set_id = self._find(content_hash)
+        else:
+            question_set = QuestionSet(content_hash=content_hash)
+            db.session.add(question_set)
+            db.session.flush()
+            question_set_id = question_set.id
+
+        db.session.execute(Question.__table__.insert(), [
+            {'question_set_id': question_set_id, 'phrase': q.phrase, 'answer': q.answer} for q in questions])
+        logger.info(f"Created question set {question_set_id} with {len(questions)} questions")
+        return question_set_id
+
+    def _find(self, content_hash):
+        return db.session.query(QuestionSet.id).filter(QuestionSet.content_hash == content_hash).scalar()
+
+    def questions(self, question_set_id):
+        """The set's questions in order, loaded from the DB only the first time."""
+        with self._lock:
+            questions = self._sets.get(question_set_id)
+            if questions is not None:
+                self._sets.move_to_end(question_set_id)
+                return questions
+
+        rows = db.session.query(Question.id, Question.phrase, Question.answer).filter(
+            Question.question_set_id == question_set_id).order_by(Question.id).all()
+        questions = tuple(BankQuestion(*row) for row in rows)
+        with self._lock:
+            questions = self._sets.setdefault(question_set_id, questions)
+            while len(self._sets) > self.max_sets:
+                self._sets.popitem(last=False)
+        return questions
+
+    def for_game(self, game):
+        """A game's questions, from its shared set or, for older games, its own rows."""
+        if game.question_set_id is not None:
+            return self.questions(game.question_set_id)
+        rows = db.session.query(Question.id, Question.phrase, Question.answer).filter(
+            Question.game_id == game.id).order_by(Question.id).all()
+        return tuple(BankQuestion(*row) for row in rows)
+
+
+question_bank = QuestionBank()
@@ -0,0 +1,203 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from logging import getLogger
+from urllib.parse import urlparse
+
+from flask import jsonify, request
+
+from metrics import Counter
+
+
+# Initialize logger
+logger = getLogger(__name__)
+
+# Tokens refill at `rate` per second up to `burst`; each request takes one
+Limit = namedtuple('Limit', ['rate', 'burst'])
+Decision = namedtuple('Decision', ['allowed', 'scope', 'retry_after'])
+
+ALLOWED = Decision(True, None, 0.0)
+
+JOIN = 'join'
+SUBMIT = 'submit'
+SOCKET_JOIN = 'socket_join'
+
+WALLET = 'wallet'
+IP = 'ip'
+GAME = 'game'
+
+# Per action and scope; override any of them with the RATE_LIMITS config dict
+DEFAULT_LIMITS = {
+    JOIN: {WALLET: Limit(0.2, 5), IP: Limit(1, 20), GAME: Limit(50, 200)},
+    SUBMIT: {WALLET: Limit(0.5, 3), IP: Limit(5, 50), GAME: Limit(200, 1000)},
+    SOCKET_JOIN: {IP: Limit(2, 20), GAME: Limit(100, 500)},
+}
+
+
+class MemoryBackend:
+    """Token buckets in this process; idle buckets are dropped once max_keys is reached."""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> [tokens, updated]
+        self._lock = threading.Lock()
+
+    def consume(self, buckets, cost=1):
+        """Take `cost` tokens from every (key, limit) bucket, or from none of them.
+
+        Returns None when allowed, else (index of the first empty bucket, seconds until it refills).
+        """
+        now = time.monotonic()
+        with self._lock:
+            refilled = []
+            for index, (key, limit) in enumerate(buckets):
+                state = self._buckets.get(key)
+                tokens = limit.burst if state is None else min(limit.burst, state[0] + (now - state[1]) * limit.rate)
+                if tokens < cost:
+                    return index, (cost - tokens) / limit.rate
+                refilled.append(tokens)
+
+            for (key, limit), tokens in zip(buckets, refilled):
+                self._buckets[key] = [tokens - cost, now]
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return None
+
+
+class RedisBackend:
+    """Token buckets shared by every worker, updated atomically by one Lua script call per check."""
+
+    SCRIPT = """
+redis.replicate_commands()  -- Needed before Redis 5 to write after reading TIME
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local cost = tonumber(ARGV[1])
+local tokens = {}
+for i, key in ipairs(KEYS) do
+    local rate, burst = tonumber(ARGV[2 * i]), tonumber(ARGV[2 * i + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'updated')
+    local t = tonumber(state[1]) or burst
+    t = math.min(burst, t + math.max(0, now - (tonumber(state[2]) or now)) * rate)
+    if t < cost then
+        return {i, tostring((cost - t) / rate)}
+    end
+    tokens[i] = t
+end
+for i, key in ipairs(KEYS) do
+    local rate, burst = tonumber(ARGV[2 * i]), tonumber(ARGV[2 * i + 1])
+    redis.call('HSET', key, 'tokens', tokens[i] - cost, 'updated', now)
+    redis.call('PEXPIRE', key, math.ceil(burst / rate * 1000))
+end
+return {0, '0'}
+"""
+
+    def __init__(self, url, prefix='wtw-ratelimit:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_STORAGE is a redis:// URL but the redis package is not installed")
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    def consume(self, buckets, cost=1):
+        args = [cost]
+        for _, limit in buckets:
+            args.extend((limit.rate, limit.burst))
+        index, retry_after = self._script(keys=[self.prefix + key for key, _ in buckets], args=args)
+        if not index:
+            return None
+        return int(index) - 1, float(retry_after)
+
+
+def create_backend(url):
+    """memory:// (default, per process) or redis://host/db shared between workers."""
+    if not url or urlparse(url).scheme == 'memory':
+        return MemoryBackend()
+    if urlparse(url).scheme in ('redis', 'rediss', 'unix'):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported RATE_LIMIT_STORAGE {url!r}")
+
+
+class RateLimiter:
+    """Token-bucket limits per wallet, per client IP and per game for joins and submissions.
+
+    A check is a dictionary lookup (or one Redis round trip with a shared
+    backend), so abusive traffic is turned away before any query runs. A request
+    takes a token from every bucket it falls into, or from none if any is empty.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.enabled = True
+        self.proxy_count = 0
+        self.limits = {action: dict(scopes) for action, scopes in DEFAULT_LIMITS.items()}
+        self.backend = MemoryBackend()
+        self.checks = Counter('wtw_rate_limit_checks_total', 'Rate limit checks by action.', ['action'])
+        self.rejected = Counter('wtw_rate_limit_rejected_total', 'Requests rejected by the rate limiter.',
+                                ['action', 'scope'])
+        self.errors = Counter('wtw_rate_limit_backend_errors_total',
+                              'Checks let through because the rate limit backend failed.', ['action'])
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['rate_limiter'] = self
+        self.enabled = bool(app.config.get('RATE_LIMIT_ENABLED', True))
+        self.proxy_count = int(app.config.get('RATE_LIMIT_PROXY_COUNT', 0))
+        for action, scopes in (app.config.get('RATE_LIMITS') or {}).items():
+            self.limits.setdefault(action, {}).update({scope: Limit(*limit) for scope, limit in scopes.items()})
+        self.backend = create_backend(app.config.get('RATE_LIMIT_STORAGE'))
+
+    def client_ip(self):
+        # Behind N trusted proxies the client is the Nth address from the right of X-Forwarded-For
+        if self.proxy_count:
+            route = request.access_route
+            if len(route) >= self.proxy_count:
+                return route[-self.proxy_count]
+        return request.remote_addr
+
+    def check(self, action, wallet=None, ip=None, game_id=None):
+        """Consume one request for `action`; returns a Decision naming the exhausted scope, if any."""
+        if not self.enabled:
+            return ALLOWED
+        limits = self.limits.get(action, {})
+        scopes = [(scope, value) for scope, value in ((WALLET, wallet), (IP, ip), (GAME, game_id))
+                  if value is not None and scope in limits]
+        if not scopes:
+            return ALLOWED
+        buckets = [(f'{action}:{scope}:{value}', limits[scope]) for scope, value in scopes]
+
+        self.checks.inc(action=action)
+        try:
+            result = self.backend.consume(buckets)
+        except Exception as e:
+            # A limiter outage must not take the game down with it
+            self.errors.inc(action=action)
+            logger.error(f"Rate limit backend error: {e}")
+            return ALLOWED
+        if result is None:
+            return ALLOWED
+
+        index, retry_after = result
+        scope = scopes[index][0]
+        self.rejected.inc(action=action, scope=scope)
+        return Decision(False, scope, retry_after)
+
+    def check_request(self, action, wallet=None, game_id=None):
+        """check() for the current HTTP request; returns a 429 response when limited, else None."""
+        decision = self.check(action, wallet=wallet, ip=self.client_ip(), game_id=game_id)
+        if decision.allowed:
+            return None
+        response = jsonify({'success': False, 'message': 'Too many requests. Please slow down.',
+                            'retry_after': round(decision.retry_after, 3)})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(max(1, int(decision.retry_after + 0.999)))
+        return response
+
+    def collect(self):
+        """Prometheus exposition lines for metrics.add_collector."""
+        return self.checks.render() + self.rejected.render() + self.errors.render()
+
+
+rate_limiter = RateLimiter()
@@ -1,52 +1,110 @@
+import base64
 import datetime  # This allows the usage of datetime.datetime.now() and datetime.timedelta()
 from datetime import timedelta, timezone  # timedelta is specifically imported to handle time differences
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, session
-from models import Game, Player, Question, Admin
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, session, current_app, Response, stream_with_context, abort
+from models import Game, Player, Admin
 from forms import CreateGameForm, JoinGameForm
 from extensions import db, socketio
 from werkzeug.security import check_password_hash
-from sqlalchemy.orm import joinedload
-from sqlalchemy import func
-from utils import make_aware, calculate_game_statistics  # Import utility functions
+from werkzeug.exceptions import HTTPException
+from markupsafe import Markup
+from sqlalchemy import func, or_, and_
+from utils import calculate_game_statistics  # Import utility functions
+from lifecycle import game_scheduler
+from answers import answer_keys
+from submissions import submission_queue
+from leaderboard import leaderboards
+from versions import game_versions
+from stats import game_statistics
+from database import pool_metrics
+from admission import game_admission, JOINED, FULL, CLOSED
+from question_bank import QuestionSpec, question_bank
+from importer import ImportValidationError, detect_format, import_games, parse_import
+from exports import ExportError, export, export_filename, parse_bound
+from archive import decode_payload, game_archiver
+from fragments import fragment_cache
+from ratelimit import rate_limiter, JOIN, SUBMIT
+from addresses import ethereum_addresses
+from views import emit_game_event, emit_phase_change, LOBBY_ROOM, RESULTS
 from logging import getLogger
 
 
 # Initialize logger
 logger = getLogger(__name__)
 
-# Function to update game statuses
-def update_game_statuses():
-    current_time = datetime.datetime.now(datetime.timezone.utc)  # Make sure current time is timezone-aware (UTC)
+# Statuses accepted by the admin game listing filters
+GAME_STATUSES = ('upcoming', 'live', 'completed')
 
-    games = Game.query.all()
 
-    for game in games:
-        try:
-            # Convert start_time and end_time to timezone-aware UTC if not already
-            if game.start_time and game.start_time.tzinfo is None:
-                game.start_time = game.start_time.replace(tzinfo=datetime.timezone.utc)
-            if game.end_time is None and game.time_limit:  # Ensure end_time is set
-                game.end_time = game.start_time + datetime.timedelta(seconds=game.time_limit)
-            elif game.end_time and game.end_time.tzinfo is None:
-                game.end_time = game.end_time.replace(tzinfo=datetime.timezone.utc)
-
-            # Start the game if current time has passed the start time
-            if current_time >= game.start_time and not game.has_started:
-                game.has_started = True
-                db.session.commit()
-                socketio.emit('game_updated', {'game_id': game.id, 'status': 'started'}, namespace='/game')
-
-            # Complete the game if current time has passed the end time
-            if game.end_time and current_time >= game.end_time and not game.is_complete:
-                game.is_complete = True
-                db.session.commit()
-                socketio.emit('game_updated', {'game_id': game.id, 'status': 'completed'}, namespace='/game')
+def encode_cursor(created_at, game_id):
+    # URL-safe, so the `+` of the UTC offset doesn't come back as a space
+    token = f"{created_at.isoformat()}|{game_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(token).decode('ascii').rstrip('=')
 
-        except Exception as e:
-            print(f"Error updating game ID {game.id}: {e}")
-            db.session.rollback()
+
+def decode_cursor(cursor):
+    """(created_at, game_id) from a cursor made by encode_cursor; raises ValueError if it is malformed."""
+    try:
+        token = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        created_at, game_id = token.rsplit('|', 1)
+        return datetime.datetime.fromisoformat(created_at), int(game_id)
+    except ValueError:  # Also binascii.Error and UnicodeDecodeError
+        raise ValueError(f"invalid cursor {cursor!r}")
+
+
+# Keyset-paginated game listing for the admin dashboard and /admin/api/games
+def fetch_games_page(cursor=None, status=None, limit=50):
+    query = db.session.query(
+        Game.id, Game.start_time, Game.end_time, Game.pot_size, Game.max_players,
+        Game.has_started, Game.is_complete, Game.created_at
+    )
+
+    if status == 'upcoming':
+        query = query.filter(Game.is_complete.isnot(True), Game.has_started.isnot(True))
+    elif status == 'live':
+        query = query.filter(Game.is_complete.isnot(True), Game.has_started.is_(True))
+    elif status == 'completed':
+        query = query.filter(Game.is_complete.is_(True))
+
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        created_at, game_id = position
+        query = query.filter(or_(Game.created_at < created_at,
+                                 and_(Game.created_at == created_at, Game.id < game_id)))
+
+    # Fetch one extra row to know whether there is a next page
+    games = query.order_by(Game.created_at.desc(), Game.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(games) > limit:
+        games = games[:limit]
+        next_cursor = encode_cursor(games[-1].created_at, games[-1].id)
+
+    # One grouped count for the page instead of loading every player collection
+    player_counts = dict(
+        db.session.query(Player.game_id, func.count(Player.id))
+        .filter(Player.game_id.in_([game.id for game in games]))
+        .group_by(Player.game_id)
+        .all()
+    ) if games else {}
+
+    return games, player_counts, next_cursor
 
 
+# Homepage game list: the columns it shows and one grouped player count, no player rows loaded
+def fetch_index_games():
+    games = db.session.query(
+        Game.id, Game.start_time, Game.pot_size, Game.entry_value, Game.max_players, Game.has_started
+    ).filter(Game.is_complete.is_(False)).order_by(Game.start_time).all()
+
+    player_counts = dict(
+        db.session.query(Player.game_id, func.count(Player.id))
+        .filter(Player.game_id.in_([game.id for game in games]))
+        .group_by(Player.game_id)
+        .all()
+    ) if games else {}
+
+    return games, player_counts
+
 
 # Blueprint creation for routes
 def create_routes():
@@ -66,58 +124,89 @@ def create_routes():
         }  # Define default_statistics at the start
 
         try:
-            update_game_statuses()
-            games = Game.query.filter_by(is_complete=False).options(joinedload(Game.players)).order_by(Game.start_time).all()
-            for game in games:
-                game.start_time = make_aware(game.start_time)
-                if game.end_time:
-                    game.end_time = make_aware(game.end_time)
-                game.start_time_iso = game.start_time.isoformat()
-            statistics = calculate_game_statistics()  # Ensure this call works
-            return render_template('index.html', games=games, len=len, now=datetime.datetime.now(datetime.timezone.utc), statistics=statistics)
+            # Both the page and its game list are re-rendered only when some game changes
+            version = game_versions.current
+
+            def render_games():
+                games, player_counts = fetch_index_games()
+                return render_template('partials/games_list.html', games=games, player_counts=player_counts)
+
+            def render_page():
+                games_html = fragment_cache.get(('index', 'games'), version, render_games)
+                statistics = calculate_game_statistics()  # Ensure this call works
+                return render_template('index.html', games_html=games_html, now=datetime.datetime.now(datetime.timezone.utc), statistics=statistics)
+
+            # A visitor with pending flash messages gets their own page; everyone else shares one
+            if '_flashes' in session:
+                return render_page()
+            return fragment_cache.get(('index',), version, render_page)
         except Exception as e:
-            logger.error(f"Error updating game statuses or querying games: {str(e)}")
-            return render_template('index.html', games=[], len=len, now=datetime.datetime.now(datetime.timezone.utc), statistics=default_statistics)
+            logger.error(f"Error querying games: {str(e)}")
+            games_html = render_template('partials/games_list.html', games=[], player_counts={})
+            return render_template('index.html', games_html=Markup(games_html), now=datetime.datetime.now(datetime.timezone.utc), statistics=default_statistics)
 
 
 
     # Lobby route
     @main.route('/game/<int:game_id>/lobby', methods=['GET', 'POST'])
     def game_lobby(game_id):
-        game = Game.query.get_or_404(game_id)
-        game.start_time = make_aware(game.start_time)
-        players = Player.query.filter_by(game_id=game.id).all()
-
-        # Redirect to play page if game has started
-        current_time = datetime.datetime.now(timezone.utc)
-        if game.has_started or current_time >= game.start_time:
-            return redirect(url_for('main.play_game', game_id=game.id))
-
         # Wallet connection only
         if request.method == 'POST':
-            data = request.get_json()
-            ethereum_address = data.get('ethereum_address')
+            data = request.get_json(silent=True)
+            # Valid JSON need not be an object (`[]`, `"0x…"`)
+            ethereum_address = data.get('ethereum_address') if isinstance(data, dict) else None
 
             if not ethereum_address:
                 return jsonify({'success': False, 'message': 'Ethereum address is required.'}), 400
 
-            # Check if the player already exists for this game
-            existing_player = Player.query.filter_by(game_id=game.id, ethereum_address=ethereum_address).first()
-
-            if not existing_player:
-                # Add new player to the game
-                new_player = Player(game_id=game.id, ethereum_address=ethereum_address)
-                db.session.add(new_player)
-                db.session.commit()
+            # One player per wallet however the client cased it
+            ethereum_address = ethereum_addresses.canonical(ethereum_address)
+            if ethereum_address is None:
+                return jsonify({'success': False, 'message': 'Invalid Ethereum address.'}), 400
+
+            # Turn floods away before any seat or database work
+            limited = rate_limiter.check_request(JOIN, wallet=ethereum_address, game_id=game_id)
+            if limited is not None:
+                return limited
+
+            # Seats are counted in memory, so a full or started game is turned away without a query
+            result = game_admission.join(game_id, ethereum_address)
+            if result.status == FULL:
+                return jsonify({'success': False, 'message': 'This game is full.',
+                                'player_count': result.player_count}), 409
+            if result.status == CLOSED:
+                return jsonify({'success': False, 'message': 'This game has already started.',
+                                'redirect_url': url_for('main.play_game', game_id=game_id)}), 409
+
+            if result.status == JOINED:
+                game_statistics.record_player_joined()
+                leaderboards.record_score(game_id, ethereum_address, 0, result.joined_at)
+                game_versions.bump(game_id)
 
                 # Emit an event to update the player count on the frontend
-                socketio.emit('player_joined', {'game_id': game.id, 'player_count': len(players) + 1}, namespace='/game')
+                emit_game_event('player_joined', {'game_id': game_id, 'player_count': result.player_count,
+                                                  'ethereum_address': ethereum_address}, game_id, lobby=True)
 
             # Store Ethereum address in session
             session['ethereum_address'] = ethereum_address
-            return jsonify({'success': True, 'message': 'Wallet connected successfully!'}), 200
+            return jsonify({'success': True, 'message': 'Wallet connected successfully!',
+                            'player_count': result.player_count}), 200
+
+        game = Game.query.get_or_404(game_id)
+
+        # Redirect to play page if game has started
+        current_time = datetime.datetime.now(timezone.utc)
+        if game.has_started or current_time >= game.start_time:
+            return redirect(url_for('main.play_game', game_id=game.id))
 
-        return render_template('game/lobby.html', game=game, players=players)
+        def render_lobby():
+            players = db.session.query(Player.ethereum_address).filter(Player.game_id == game.id).order_by(Player.id).all()
+            return render_template('game/lobby.html', game=game, players=players)
+
+        # Re-rendered only when this game changes (a join, a re-time, the start)
+        if '_flashes' in session:
+            return render_lobby()
+        return fragment_cache.get(('lobby', game.id), game_versions.game(game.id), render_lobby)
 
 
     # Play game route
@@ -128,10 +217,8 @@ def create_routes():
 
         # Corrected datetime usage
         current_time = datetime.datetime.now(datetime.timezone.utc)
-        game_start_time = make_aware(game.start_time)
-
         # Check if the game has started or not
-        if game_start_time > current_time:
+        if game.start_time > current_time:
             flash('The game has not started yet.', 'warning')
             return redirect(url_for('main.game_lobby', game_id=game.id))
 
@@ -140,39 +227,26 @@ def create_routes():
             flash('This game has already ended.', 'info')
             return redirect(url_for('main.game_result', game_id=game.id))
 
-        # Start the game if it hasn't started yet
-        if not game.has_started:
-            game.has_started = True
-            db.session.commit()
-            socketio.emit('game_started', {'game_id': game.id}, namespace='/game')
-
         # Check for Ethereum address in session
-        ethereum_address = session.get('ethereum_address')
+        ethereum_address = ethereum_addresses.canonical(session.get('ethereum_address'))
         if not ethereum_address:
             flash('You need to join the game first.', 'warning')
             return redirect(url_for('main.game_lobby', game_id=game.id))
 
-        # Fetch questions and players for the game
-        questions = Question.query.filter_by(game_id=game.id).all()
-        players = Player.query.filter_by(game_id=game_id).order_by(Player.score.desc()).all()
-
         # Handle form submission
         if request.method == 'POST':
+            limited = rate_limiter.check_request(SUBMIT, wallet=ethereum_address, game_id=game.id)
+            if limited is not None:
+                return limited
+
             answers = request.form.getlist('answers[]')
             player = Player.query.filter_by(game_id=game.id, ethereum_address=ethereum_address).first()
 
             if player:
-                # Calculate the player's score
-                score = sum(1 for q, a in zip(questions, answers) if q.answer.lower() == a.lower())
-                player.score = score
-                db.session.commit()
-
-                # Emit updated score via socket
-                socketio.emit('player_score_update', {
-                    'game_id': game.id,
-                    'player_address': ethereum_address,
-                    'score': score
-                }, namespace='/game')
+                # Scored with the rest of the game's buffered submissions on the next flush; wait
+                # for it (briefly) so the results page already shows this player's score
+                ticket = submission_queue.submit(game.id, ethereum_address, answers)
+                submission_queue.wait(ticket)
 
                 # Redirect to the game result page
                 return redirect(url_for('main.game_result', game_id=game.id))
@@ -180,6 +254,10 @@ def create_routes():
                 flash('Player not found. Please rejoin the game.', 'error')
                 return redirect(url_for('main.game_lobby', game_id=game.id))
 
+        # Fetch questions and players for the game
+        questions = question_bank.for_game(game)
+        players = leaderboards.get(game_id).top()
+
         # Render the play page with questions and players
         return render_template('game/play.html', game=game, questions=questions, player_address=ethereum_address, players=players)
 
@@ -189,21 +267,37 @@ def create_routes():
     @main.route('/game/<int:game_id>/result')
     def game_result(game_id):
         game = Game.query.get_or_404(game_id)
-        players = Player.query.filter_by(game_id=game_id).order_by(Player.score.desc(), Player.joined_at).all()
+        players = leaderboards.get(game_id).top()
 
         score = request.args.get('score', type=int)
-        ethereum_address = request.args.get('ethereum_address', '')
+        ethereum_address = ethereum_addresses.canonical(request.args.get('ethereum_address')) or ''
 
         # Clear session Ethereum address
         session.pop('ethereum_address', None)
 
         return render_template('game/results.html', game=game, players=players, score=score, ethereum_address=ethereum_address)
 
+    # Leaderboard JSON route
+    @main.route('/game/<int:game_id>/leaderboard')
+    def game_leaderboard(game_id):
+        Game.query.get_or_404(game_id)
+        board = leaderboards.get(game_id)
+        limit = request.args.get('limit', 10, type=int)
+        ethereum_address = ethereum_addresses.canonical(request.args.get('ethereum_address'))
+        winner = board.winner()
+
+        return jsonify({
+            'game_id': game_id,
+            'player_count': len(board),
+            'winner': winner.to_dict() if winner else None,
+            'top': [entry.to_dict() for entry in board.top(limit)],
+            'rank': board.rank(ethereum_address) if ethereum_address else None
+        }), 200
+
     # Submit answers route
     @main.route('/game/<int:game_id>/submit', methods=['POST'])
     def submit_answers(game_id):
         try:
-            game = Game.query.get_or_404(game_id)
             answers = request.form.getlist('answers[]')
             ethereum_address = session.get('ethereum_address', request.form.get('ethereum_address'))
 
@@ -211,68 +305,93 @@ def create_routes():
                 return jsonify({'success': False, 'message': 'No answers provided.'}), 400
             if not ethereum_address:
                 return jsonify({'success': False, 'message': 'Ethereum address required.'}), 400
+            ethereum_address = ethereum_addresses.canonical(ethereum_address)
+            if ethereum_address is None:
+                return jsonify({'success': False, 'message': 'Invalid Ethereum address.'}), 400
 
-            current_time = datetime.datetime.now(datetime.timezone.utc)
+            limited = rate_limiter.check_request(SUBMIT, wallet=ethereum_address, game_id=game_id)
+            if limited is not None:
+                return limited
 
-            if game.end_time is None and game.start_time and game.time_limit:
-                game.start_time = make_aware(game.start_time)
-                game.end_time = game.start_time + datetime.timedelta(seconds=game.time_limit)
-                db.session.commit()
-            else:
-                game.end_time = make_aware(game.end_time)
+            current_time = datetime.datetime.now(datetime.timezone.utc)
 
-            if game.end_time and current_time >= game.end_time:
+            # The deadline is cached per game, so the submission burst does not re-load the game
+            end_time = submission_queue.deadline(game_id)
+            if end_time and current_time >= end_time:
                 return jsonify({'success': False, 'message': 'The game has already ended.', 
-                                'redirect_url': url_for('main.game_result', game_id=game.id, ethereum_address=ethereum_address)}), 200
-
-            # Calculate score
-            score = 0
-            questions = Question.query.filter_by(game_id=game.id).all()
-            for question, answer in zip(questions, answers):
-                if answer.strip().lower() == question.answer.strip().lower():
-                    score += 1
-
-            # Update or create player score
-            player = Player.query.filter_by(ethereum_address=ethereum_address, game_id=game.id).first()
-            if player:
-                player.score = score
-            else:
-                player = Player(ethereum_address=ethereum_address, game_id=game.id, score=score)
-                db.session.add(player)
-
-            db.session.commit()
+                                'redirect_url': url_for('main.game_result', game_id=game_id, ethereum_address=ethereum_address)}), 200
 
-            socketio.emit('player_score_update', {'game_id': game.id, 'player_address': ethereum_address, 'score': score}, namespace='/game')
+            # Acknowledge straight away; the submission queue scores and writes the game's answers in bulk
+            ticket = submission_queue.submit(game_id, ethereum_address, answers)
 
-            return jsonify({'success': True, 'redirect_url': url_for('main.game_result', game_id=game.id, score=score, ethereum_address=ethereum_address)}), 200
+            return jsonify({'success': True, 'ticket': ticket, 'redirect_url': url_for('main.game_result', game_id=game_id, ethereum_address=ethereum_address)}), 200
 
+        except HTTPException:
+            raise
         except Exception as e:
-            print(f"Error in submit_answers: {str(e)}")
+            logger.error(f"Error in submit_answers: {str(e)}")
             return jsonify({'success': False, 'message': 'An error occurred while submitting answers. Please try again later.'}), 500
 
+    # Submission ticket status route
+    @main.route('/game/<int:game_id>/submission/<ticket>')
+    def submission_status(game_id, ticket):
+        result = submission_queue.result(ticket)
+        if result is None:
+            return jsonify({'success': False, 'message': 'Unknown ticket.'}), 404
+        status, score = result
+        return jsonify({'success': True, 'ticket': ticket, 'status': status, 'score': score}), 200
+
     @admin.route('/dashboard')
     def dashboard():
+        cursor = request.args.get('cursor')
+        status = request.args.get('status') if request.args.get('status') in GAME_STATUSES else None
+        current_time = datetime.datetime.now(datetime.timezone.utc)  # Get the current time in UTC
         try:
-            # Update game statuses before fetching the games
-            update_game_statuses()
-
-            # Fetch all games ordered by creation date
-            games = Game.query.order_by(Game.created_at.desc()).all()
-            current_time = datetime.datetime.now(datetime.timezone.utc)  # Get the current time in UTC
-
-            # Ensure the start_time is timezone-aware
-            for game in games:
-                game.start_time = make_aware(game.start_time)
-                if game.end_time:
-                    game.end_time = make_aware(game.end_time)
+            games, player_counts, next_cursor = fetch_games_page(cursor, status)
 
             # Render the admin dashboard
-            return render_template('admin/dashboard.html', games=games, now=current_time)
+            return render_template('admin/dashboard.html', games=games, player_counts=player_counts,
+                                   next_cursor=next_cursor, status=status, statuses=GAME_STATUSES, now=current_time)
 
+        except ValueError:
+            # A mangled cursor must not silently restart the listing at page 1
+            abort(400, description='Invalid cursor.')
         except Exception as e:
             logger.error(f"Error rendering dashboard: {str(e)}")
             # Return an empty list in case of error
-            return render_template('admin/dashboard.html', games=[], now=datetime.datetime.now(datetime.timezone.utc))
+            return render_template('admin/dashboard.html', games=[], player_counts={}, next_cursor=None,
+                                   status=status, statuses=GAME_STATUSES, now=current_time)
+
+    @admin.route('/api/games')
+    def api_games():
+        status = request.args.get('status')
+        if status is not None and status not in GAME_STATUSES:
+            return jsonify({'success': False, 'message': f'Unknown status: {status}'}), 400
+        limit = max(1, min(request.args.get('limit', 50, type=int), 200))
+
+        try:
+            games, player_counts, next_cursor = fetch_games_page(request.args.get('cursor'), status, limit)
+        except ValueError:
+            return jsonify({'success': False, 'message': 'Invalid cursor.'}), 400
+        return jsonify({
+            'success': True,
+            'games': [{
+                'id': game.id,
+                'start_time': game.start_time.isoformat() if game.start_time else None,
+                'end_time': game.end_time.isoformat() if game.end_time else None,
+                'pot_size': game.pot_size,
+                'max_players': game.max_players,
+                'player_count': player_counts.get(game.id, 0),
+                'status': 'completed' if game.is_complete else 'live' if game.has_started else 'upcoming'
+            } for game in games],
+            'next_cursor': next_cursor
+        }), 200
+
+    @admin.route('/api/db_pool')
+    def api_db_pool():
+        # Connection pool checkout waits, for sizing DB_POOL_SIZE / DB_MAX_OVERFLOW
+        return jsonify({'success': True, 'profile': current_app.config.get('DATABASE_PROFILE'),
+                        'pool': pool_metrics.snapshot()}), 200
 
 
     @admin.route('/start_game/<int:game_id>', methods=['POST'])
@@ -283,8 +402,11 @@ def create_routes():
         else:
             game.start_time = datetime.datetime.now(datetime.timezone.utc)
             db.session.commit()
+            game_versions.bump(game.id)
+            game_admission.evict(game.id)
+            # The lifecycle scheduler flips has_started and emits game_started
+            game_scheduler.schedule(game)
             flash(f'Game {game_id} has started!', 'success')
-            socketio.emit('game_started', {'game_id': game.id}, namespace='/game')
         return redirect(url_for('admin.dashboard'))
 
 
@@ -309,6 +431,15 @@ def create_routes():
                     start_time_utc = start_time.replace(tzinfo=datetime.timezone.utc)
                     logger.info(f"Parsed start time (UTC): {start_time_utc}")
 
+                    # Store the questions once in the shared question bank (reused if identical)
+                    questions = []
+                    for i in range(12):
+                        phrase = getattr(form, f'phrase_{i}').data
+                        answer = getattr(form, f'answer_{i}').data
+                        if phrase and answer:
+                            questions.append(QuestionSpec(phrase, answer))
+                    question_set_id = question_bank.get_or_create(questions)
+
                     # Create the new game, making sure to set the `created_at` field
                     game = Game(
                         time_limit=form.time_limit.data,
@@ -316,30 +447,28 @@ def create_routes():
                         pot_size=form.pot_size.data,
                         entry_value=form.entry_value.data,
                         start_time=start_time_utc,
-                        created_at=datetime.datetime.now(datetime.timezone.utc)  # Set the created_at field
+                        created_at=datetime.datetime.now(datetime.timezone.utc),  # Set the created_at field
+                        question_set_id=question_set_id
                     )
 
                     # Set end_time using datetime.timedelta
                     game.end_time = game.start_time + datetime.timedelta(seconds=game.time_limit)
 
+                    # Game and questions are written in one commit
                     db.session.add(game)
                     db.session.commit()
-                    logger.info(f"Game created with ID: {game.id}")
+                    logger.info(f"Game created with ID: {game.id} using question set {question_set_id}")
+                    game_statistics.record_game_created(game)
 
                     # Emit a socket event for game creation
-                    socketio.emit('game_created', {'game_id': game.id}, namespace='/game')
+                    socketio.emit('game_created', {'game_id': game.id}, to=LOBBY_ROOM, namespace='/game')
 
-                    # Add the questions
-                    Question.query.filter_by(game_id=game.id).delete()  # Clear existing questions
-                    for i in range(12):
-                        phrase = getattr(form, f'phrase_{i}').data
-                        answer = getattr(form, f'answer_{i}').data
-                        if phrase and answer:
-                            question = Question(game_id=game.id, phrase=phrase, answer=answer)
-                            db.session.add(question)
+                    # Prime the answer key so scoring never needs to re-read the questions
+                    answer_keys.prime(game.id, questions, question_set_id)
+                    game_versions.bump(game.id)
 
-                    db.session.commit()
-                    logger.info("Questions added successfully")
+                    # Hand the game to the lifecycle scheduler
+                    game_scheduler.schedule(game)
 
                     # Return the success response or redirect to the dashboard
                     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -373,12 +502,49 @@ def create_routes():
 
 
 
+    @admin.route('/import_games', methods=['POST'])
+    def import_games_route():
+        # Bulk create games from an uploaded CSV / JSONL file (see importer.py for the formats)
+        upload = request.files.get('file')
+        if upload is not None:
+            try:
+                data, filename = upload.read().decode('utf-8-sig'), upload.filename
+            except UnicodeDecodeError:
+                return jsonify({'success': False, 'errors': [{'line': 0, 'message': 'the file must be UTF-8 text'}]}), 400
+        else:
+            data, filename = request.get_data(as_text=True), None
+        fmt = detect_format(filename, request.args.get('format') or request.form.get('format'))
+
+        try:
+            specs, question_sets = parse_import(data, fmt)
+        except ImportValidationError as e:
+            return jsonify({'success': False, 'errors': e.errors}), 400
+
+        if request.args.get('dry_run', '').lower() in ('1', 'true', 'yes'):
+            return jsonify({'success': True, 'dry_run': True, 'games': len(specs),
+                            'question_sets': question_sets}), 200
+
+        try:
+            games = import_games(specs)
+        except Exception as e:
+            logger.error(f"Error importing games: {str(e)}", exc_info=True)
+            return jsonify({'success': False, 'message': f'An error occurred while importing games: {str(e)}'}), 500
+        return jsonify({'success': True, 'game_ids': [game.id for game in games],
+                        'question_sets': question_sets}), 201
+
     @admin.route('/end_game/<int:game_id>', methods=['POST'])
     def end_game(game_id):
         game = Game.query.get_or_404(game_id)
         if not game.is_complete:
+            submission_queue.flush()
             game.is_complete = True
             db.session.commit()
+            game_statistics.record_game_completed(game)
+            answer_keys.evict(game.id)
+            submission_queue.close(game.id)
+            game_admission.evict(game.id)
+            game_versions.bump(game.id)
+            emit_phase_change(game, RESULTS, len(leaderboards.get(game.id)))
             flash(f'Game {game_id} has been ended successfully.', 'success')
         else:
             flash(f'Game {game_id} is already completed.', 'info')
@@ -386,9 +552,51 @@ def create_routes():
 
     @admin.route('/game_stats/<int:game_id>')
     def game_stats(game_id):
-        game = Game.query.get_or_404(game_id)
-        players = Player.query.filter_by(game_id=game_id).order_by(Player.score.desc()).all()
-        return render_template('admin/game_stats.html', game=game, players=players)
+        game = db.session.get(Game, game_id)
+        if game is None:
+            # Old completed games live in the archive once moved out of the game table
+            if game_archiver.get(game_id) is not None:
+                return redirect(url_for('admin.archived_game', game_id=game_id))
+            abort(404)
+        players = leaderboards.get(game_id).top()
+        question_stats = submission_queue.question_stats(game_id)
+        questions = question_bank.for_game(game) if question_stats else ()
+        return render_template('admin/game_stats.html', game=game, players=players, questions=questions,
+                               question_stats=question_stats)
+
+    @admin.route('/export/<kind>')
+    def export_games(kind):
+        # Streams completed games' results or players for payouts; see exports.py
+        fmt = request.args.get('format', 'csv')
+        compress = request.args.get('gzip') in ('1', 'true')
+        try:
+            since, until = parse_bound(request.args.get('since')), parse_bound(request.args.get('until'))
+            chunks = export(kind, fmt, since, until, compress)
+        except ExportError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+
+        filename = export_filename(kind, fmt, since, until, compress)
+        mimetype = 'application/gzip' if compress else 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+        return Response(stream_with_context(chunks), mimetype=mimetype,
+                        headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+    @admin.route('/archive')
+    def archive():
+        before = request.args.get('before', type=int)
+        games, next_before = game_archiver.page(before)
+        return render_template('admin/archive.html', games=games, next_before=next_before,
+                               retention_days=game_archiver.retention_days)
+
+    @admin.route('/archive/<int:game_id>')
+    def archived_game(game_id):
+        # The players / questions blob is only decompressed here, on demand
+        game = game_archiver.get(game_id)
+        if game is None:
+            abort(404)
+        players, questions = decode_payload(game.payload)
+        if game.question_set_id is not None:
+            questions = question_bank.questions(game.question_set_id)
+        return render_template('admin/archived_game.html', game=game, players=players, questions=questions)
 
     @admin.route('/login', methods=['GET', 'POST'])
     def admin_login():
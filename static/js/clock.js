@@ -0,0 +1,148 @@
+// Server-authoritative game clock shared by the lobby, play and listing pages.
+//
+// The server owns time and phases: it sends `clock_sync` (server time, phase,
+// start/end) when a client joins a game room and again just before the game
+// starts, and `phase_change` when the lifecycle engine moves a game from
+// lobby -> play -> results. Countdowns only display the corrected time; page
+// transitions happen on `phase_change`, each client after a random delay inside
+// the server's `spread_ms` so a popular game doesn't stampede the next page.
+const GameClock = (function() {
+    let offset = 0;          // Server time minus local time, in ms
+    let measured = false;    // True once a round-trip sync has set the offset
+    let ticker = null;
+    let transitioning = false;
+    const countdowns = [];
+
+    // If no phase_change arrives (e.g. the socket is down) a page falls back to
+    // its own transition this long after its countdown reaches zero
+    const FALLBACK_DELAY_MS = 5000;
+    const FALLBACK_SPREAD_MS = 5000;
+
+    function now() {
+        return Date.now() + offset;
+    }
+
+    function sync(socket) {
+        const sentAt = Date.now();
+        socket.emit('clock_sync', {}, function(data) {
+            const receivedAt = Date.now();
+            offset = data.server_time + (receivedAt - sentAt) / 2 - receivedAt;
+            measured = true;
+        });
+    }
+
+    function applyServerTime(serverTime) {
+        // Pushed timestamps carry no round-trip estimate; only use them until a sync has been measured
+        if (!measured && typeof serverTime === 'number') {
+            offset = serverTime - Date.now();
+        }
+    }
+
+    function pad(value) {
+        return value.toString().padStart(2, '0');
+    }
+
+    function format(ms, withDays) {
+        const days = Math.floor(ms / 86400000);
+        const hours = Math.floor((ms % 86400000) / 3600000);
+        const minutes = Math.floor((ms % 3600000) / 60000);
+        const seconds = Math.floor((ms % 60000) / 1000);
+        if (withDays) {
+            return `${days}d ${hours}h ${minutes}m ${seconds}s`;
+        }
+        return `${pad(Math.floor(ms / 60000))}:${pad(seconds)}`;
+    }
+
+    function tick() {
+        const current = now();
+        countdowns.forEach(countdown => {
+            const timeLeft = countdown.target - current;
+            if (timeLeft > 0) {
+                countdown.element.textContent = format(timeLeft, countdown.withDays);
+            } else if (!countdown.expired) {
+                countdown.expired = true;
+                countdown.element.textContent = countdown.expiredText;
+                if (countdown.onExpire) {
+                    countdown.onExpire();
+                }
+            }
+        });
+    }
+
+    // Display a countdown to `target` (ms since epoch, or anything Date() accepts).
+    // All countdowns on a page share a single timer.
+    function addCountdown(element, target, options) {
+        options = options || {};
+        const targetMs = typeof target === 'number' ? target : new Date(target).getTime();
+        if (isNaN(targetMs)) {
+            console.error('Invalid countdown target:', target);
+            return null;
+        }
+        const countdown = {
+            element: element,
+            target: targetMs,
+            withDays: !!options.withDays,
+            expiredText: options.expiredText || '',
+            onExpire: options.onExpire,
+            expired: false
+        };
+        countdowns.push(countdown);
+        tick();
+        if (!ticker) {
+            ticker = setInterval(tick, 1000);
+        }
+        return countdown;
+    }
+
+    function transition(url, spreadMs) {
+        if (transitioning) {
+            return;
+        }
+        transitioning = true;
+        setTimeout(() => { window.location.href = url; }, Math.random() * (spreadMs || 0));
+    }
+
+    function fallbackTransition(url) {
+        setTimeout(() => transition(url, FALLBACK_SPREAD_MS), FALLBACK_DELAY_MS);
+    }
+
+    // Join a game's room and route its clock and phase events to `handlers`,
+    // keyed by phase name ('lobby', 'play', 'results') plus an optional `sync`.
+    function watchGame(socket, gameId, handlers) {
+        handlers = handlers || {};
+
+        socket.on('connect', function() {
+            socket.emit('join', { game_id: gameId });
+            sync(socket);
+        });
+
+        socket.on('clock_sync', function(data) {
+            if (data.game_id !== gameId) {
+                return;
+            }
+            applyServerTime(data.server_time);
+            if (handlers.sync) {
+                handlers.sync(data);
+            }
+        });
+
+        socket.on('phase_change', function(data) {
+            if (data.game_id !== gameId) {
+                return;
+            }
+            applyServerTime(data.server_time);
+            if (handlers[data.phase]) {
+                handlers[data.phase](data);
+            }
+        });
+    }
+
+    return {
+        now: now,
+        sync: sync,
+        addCountdown: addCountdown,
+        transition: transition,
+        fallbackTransition: fallbackTransition,
+        watchGame: watchGame
+    };
+})();
@@ -1,5 +1,7 @@
 document.addEventListener('DOMContentLoaded', function() {
-    // Function to initialize countdowns for all games
+    // Function to initialize countdowns for all games. The display follows the
+    // server clock (see clock.js); moving to the play page is left to the
+    // server's phase_change event so every browser doesn't redirect at once.
     function initializeCountdowns() {
         const countdownElements = document.querySelectorAll('.countdown');
 
@@ -12,27 +14,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 return; // Exit if the countdown element does not have a start time
             }
 
-            const startTime = new Date(startTimeStr);
-            if (isNaN(startTime)) {
-                console.error('Invalid start time for game ID:', gameId, startTimeStr);
-                return;
-            }
-
-            const timer = setInterval(() => {
-                const now = new Date();
-                const timeLeft = startTime - now;
-
-                if (timeLeft <= 0) {
-                    clearInterval(timer);
-                    startTimeElement.textContent = "Game has started!";
-                    // Redirect to the game page when the countdown ends
-                    window.location.href = `/game/${gameId}/play`; // Adjust this URL as necessary
-                } else {
-                    const minutes = Math.floor(timeLeft / 60000);
-                    const seconds = Math.floor((timeLeft % 60000) / 1000);
-                    startTimeElement.textContent = `${minutes.toString().padStart(2, '0')}:${seconds.toString().padStart(2, '0')}`;
-                }
-            }, 1000);
+            GameClock.addCountdown(startTimeElement, startTimeStr, { expiredText: 'Game has started!' });
         });
     }
 
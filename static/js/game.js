@@ -21,30 +21,20 @@
                 return;
             }
 
-            const endTime = new Date(endTimeStr);
-            let timer;
+            let submitted = false;
 
             function startTimer() {
-                function updateCountdown() {
-                    const now = new Date();
-                    const timeLeft = endTime - now;
-
-                    if (timeLeft <= 0) {
-                        clearInterval(timer);
-                        submitAnswers();
-                    } else {
-                        const minutes = Math.floor(timeLeft / 60000);
-                        const seconds = Math.floor((timeLeft % 60000) / 1000);
-                        const formattedTime = `${minutes.toString().padStart(2, '0')}:${seconds.toString().padStart(2, '0')}`;
-                        countdownElement.textContent = formattedTime;
-                    }
-                }
-
-                updateCountdown();
-                timer = setInterval(updateCountdown, 1000);
+                // Counts down on the server clock and submits once time is up
+                GameClock.addCountdown(countdownElement, endTimeStr, {
+                    onExpire: submitAnswers
+                });
             }
 
             function submitAnswers() {
+                if (submitted) {
+                    return;
+                }
+                submitted = true;
                 const formData = new FormData(form);
 
                 fetch(form.action, {
@@ -80,7 +70,6 @@
 
             form.addEventListener('submit', function(event) {
                 event.preventDefault();
-                clearInterval(timer);
                 submitAnswers();
             });
         }
@@ -88,34 +77,17 @@
         function initializeLobby() {
             const gameId = parseInt(document.getElementById('game-id').value);
             const countdownElement = document.getElementById('countdown');
-            let timer;
-
-            function updateLobbyCountdown() {
-                const startTimeStr = countdownElement.dataset.startTime;
+            const startTimeStr = countdownElement.dataset.startTime;
 
-                if (!startTimeStr) {
-                    console.error('Game start time is not set.');
-                    return;
-                }
-
-                const startTime = new Date(startTimeStr);
-                const now = new Date();
-                const timeLeft = startTime - now;
-
-                if (timeLeft <= 0) {
-                    clearInterval(timer);
-                    window.location.href = `/game/${gameId}/play`;
-                } else {
-                    const minutes = Math.floor(timeLeft / 60000);
-                    const seconds = Math.floor((timeLeft % 60000) / 1000);
-                    const formattedTime = `${minutes.toString().padStart(2, '0')}:${seconds.toString().padStart(2, '0')}`;
-                    countdownElement.textContent = formattedTime;
-                }
+            if (!startTimeStr) {
+                console.error('Game start time is not set.');
+            } else {
+                // The server's phase_change moves the page on; this is only the fallback
+                GameClock.addCountdown(countdownElement, startTimeStr, {
+                    onExpire: () => GameClock.fallbackTransition(`/game/${gameId}/play`)
+                });
             }
 
-            updateLobbyCountdown();
-            timer = setInterval(updateLobbyCountdown, 1000);
-
             const joinGameForm = document.getElementById('join-game-form');
             if (joinGameForm) {
                 joinGameForm.addEventListener('submit', function(event) {
@@ -161,14 +133,10 @@
             if (typeof io !== 'undefined') {
                 const socket = io('/game');
 
-                socket.on('connect', function() {
-                    console.log('Connected to game namespace');
-                });
-
-                socket.on('game_started', function(data) {
-                    if (data.game_id === gameId) {
+                GameClock.watchGame(socket, gameId, {
+                    play: function(data) {
                         console.log('Game started event received.');
-                        window.location.href = `/game/${gameId}/play`;
+                        GameClock.transition(`/game/${gameId}/play`, data.spread_ms);
                     }
                 });
 
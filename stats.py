@@ -0,0 +1,130 @@
+import threading
+from logging import getLogger
+
+from sqlalchemy import func, case
+
+from extensions import db, socketio
+from models import ArchiveTotals, Game, Player
+
+
+# Initialize logger
+logger = getLogger(__name__)
+
+
+class GameStatistics:
+    """Running totals behind the homepage statistics.
+
+    The totals are bumped in memory on game creation, player join and game
+    completion, and a periodic reconciliation job recomputes them from the
+    database to correct any drift (manual edits, failed commits, other workers).
+    Increments recorded while a reconciliation's queries run are collected and
+    added on top of its snapshot, so they are not lost when it is swapped in (one
+    whose commit the queries already saw is counted twice until the next pass).
+    """
+
+    def __init__(self, reconcile_interval=300):
+        self.app = None
+        self.reconcile_interval = reconcile_interval
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._running = False
+        self._total_games = 0
+        self._total_rewards = 0
+        self._total_players = 0
+        self._completed_games = 0
+        self._total_time = 0
+        self._in_flight = []  # One [games, rewards, completed, time, players] delta list per running reconcile
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['game_statistics'] = self
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            socketio.start_background_task(self._run)
+
+    def reconcile(self):
+        """Recompute every total from the database (two aggregate queries plus the archive totals row)."""
+        deltas = [0, 0, 0, 0, 0]
+        with self._lock:
+            self._in_flight.append(deltas)
+        try:
+            totals = self._query_totals()
+        except Exception:
+            with self._lock:
+                self._in_flight.remove(deltas)
+            raise
+
+        with self._lock:
+            self._in_flight.remove(deltas)
+            (self._total_games, self._total_rewards, self._completed_games, self._total_time,
+             self._total_players) = [total + delta for total, delta in zip(totals, deltas)]
+            self._loaded = True
+
+    def _query_totals(self):
+        totals = db.session.query(
+            func.count(Game.id),
+            func.coalesce(func.sum(Game.pot_size), 0),
+            func.coalesce(func.sum(case((Game.is_complete.is_(True), 1), else_=0)), 0),
+            func.coalesce(func.sum(case((Game.is_complete.is_(True), Game.time_limit), else_=0)), 0),
+        ).one()
+        total_players = db.session.query(func.count(Player.id)).scalar() or 0
+
+        # Archived games are all complete and no longer in `game` / `player`
+        archived = db.session.get(ArchiveTotals, 1)
+        if archived is not None:
+            totals = (totals[0] + archived.games, totals[1] + archived.rewards, totals[2] + archived.games,
+                      totals[3] + archived.time)
+            total_players += archived.players
+        # Same order as the _record() deltas: games, rewards, completed, time, players
+        return tuple(totals) + (total_players,)
+
+    def _record(self, games=0, rewards=0, completed=0, time=0, players=0):
+        with self._lock:
+            self._total_games += games
+            self._total_rewards += rewards
+            self._completed_games += completed
+            self._total_time += time
+            self._total_players += players
+            for deltas in self._in_flight:
+                for i, value in enumerate((games, rewards, completed, time, players)):
+                    deltas[i] += value
+
+    def record_game_created(self, game):
+        self._record(games=1, rewards=game.pot_size or 0)
+
+    def record_player_joined(self, count=1):
+        self._record(players=count)
+
+    def record_game_completed(self, game):
+        self._record(completed=1, time=game.time_limit or 0)
+
+    def snapshot(self):
+        """Return the statistics dict rendered on the index page."""
+        if not self._loaded:
+            self.reconcile()
+
+        with self._lock:
+            completed = self._completed_games
+            return {
+                'total_games': self._total_games,
+                'total_rewards': self._total_rewards,
+                'total_players': self._total_players,
+                'total_time': self._total_time,
+                'avg_time_per_game': self._total_time / completed if completed > 0 else 0,
+                'avg_earnings_per_winner': self._total_rewards / completed if completed > 0 else 0
+            }
+
+    def _run(self):
+        while True:
+            with self.app.app_context():
+                try:
+                    self.reconcile()
+                except Exception as e:
+                    logger.error(f"Error reconciling game statistics: {e}")
+                    db.session.rollback()
+            socketio.sleep(self.reconcile_interval)
+
+
+game_statistics = GameStatistics()
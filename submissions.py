@@ -0,0 +1,309 @@
+import datetime
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from logging import getLogger
+
+import click
+from flask import abort
+
+from answers import answer_keys
+from extensions import db, socketio
+from leaderboard import leaderboards
+from models import Game, Player
+from stats import game_statistics
+from versions import game_versions
+from views import emit_game_event
+
+
+# Initialize logger
+logger = getLogger(__name__)
+
+class SubmissionQueue:
+    """Write-behind pipeline for answer submissions.
+
+    Submissions are acknowledged with a ticket as soon as they arrive; a
+    background greenthread then scores each game's buffered answers in one
+    batch (answers.score_batch), writes the scores with one bulk UPSERT per game
+    and emits a single aggregated leaderboard update, so the end-of-game burst
+    costs N / batch_size commits instead of N. Each wallet's last scored
+    answers are kept per game, so the admin stats page can show per-question
+    correctness over players rather than over every resubmission.
+
+    A batch that fails to write goes back to the front of the queue and is
+    retried with exponential backoff; after max_attempts its submissions are appended
+    to the dead-letter file (SUBMISSION_DEAD_LETTER) for `flask
+    replay-submissions`, so an acknowledged ticket is never silently dropped.
+    """
+
+    def __init__(self, batch_size=200, flush_interval=0.25, max_tickets=50000, max_games=1000,
+                 max_attempts=5, deadline_ttl=5, wait_timeout=2.0,
+                 dead_letter_path='dead_letter_submissions.jsonl'):
+        self.app = None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_tickets = max_tickets
+        self.max_games = max_games
+        self.max_attempts = max_attempts
+        self.deadline_ttl = deadline_ttl
+        self.wait_timeout = wait_timeout
+        self.dead_letter_path = dead_letter_path
+        self._pending = []  # (ticket, game_id, ethereum_address, answers, attempts)
+        self._tickets = OrderedDict()  # ticket -> (status, score)
+        self._final_answers = OrderedDict()  # game_id -> {ethereum_address: answers of its last scored submission}
+        self._deadlines = OrderedDict()  # game_id -> (end_time, expires)
+        self._retry_at = 0.0  # Monotonic time before which a failed batch is not retried
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition(self._lock)  # Notified whenever tickets change status
+        self._wakeup = threading.Event()
+        self._running = False
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['submission_queue'] = self
+        self.dead_letter_path = app.config.get('SUBMISSION_DEAD_LETTER', self.dead_letter_path)
+
+        @app.cli.command('replay-submissions')
+        @click.argument('path', required=False)
+        def replay_submissions_command(path):
+            """Re-queue dead-lettered submissions and write them."""
+            replayed = self.replay(path or self.dead_letter_path)
+            click.echo(f"Replayed {replayed} submissions")
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            socketio.start_background_task(self._run)
+
+    def deadline(self, game_id):
+        """Return the game's end_time, re-loading it at most every deadline_ttl seconds.
+
+        The short TTL lets a game ended early on another worker close here too.
+        """
+        now = time.monotonic()
+        cached = self._deadlines.get(game_id)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        game = db.session.get(Game, game_id)
+        if game is None:
+            abort(404)
+        end_time = game.end_time
+        if end_time is None and game.start_time and game.time_limit:
+            end_time = game.start_time + datetime.timedelta(seconds=game.time_limit)
+        if game.is_complete:
+            current_time = datetime.datetime.now(datetime.timezone.utc)
+            end_time = min(end_time, current_time) if end_time else current_time
+        with self._lock:
+            self._deadlines[game_id] = (end_time, now + self.deadline_ttl)
+            self._deadlines.move_to_end(game_id)
+            while len(self._deadlines) > self.max_games:
+                self._deadlines.popitem(last=False)
+        return end_time
+
+    def submit(self, game_id, ethereum_address, answers):
+        """Queue a submission to be scored and written by the next flush. Returns its ticket."""
+        ticket = uuid.uuid4().hex
+        with self._lock:
+            self._pending.append((ticket, game_id, ethereum_address, list(answers), 0))
+            self._tickets[ticket] = ('pending', None)
+            while len(self._tickets) > self.max_tickets:
+                self._tickets.popitem(last=False)
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.set()
+        return ticket
+
+    def result(self, ticket):
+        """(status, score) of a ticket; the score is None until its batch has been scored."""
+        return self._tickets.get(ticket)
+
+    def wait(self, ticket, timeout=None):
+        """Block until a ticket's batch has been written or given up on; returns result(ticket).
+
+        Gives up after `timeout` (wait_timeout) seconds, e.g. while the batch is being retried.
+        """
+        with self._flushed:
+            self._flushed.wait_for(lambda: (self._tickets.get(ticket) or ('unknown',))[0] != 'pending',
+                                   self.wait_timeout if timeout is None else timeout)
+            return self._tickets.get(ticket)
+
+    def question_stats(self, game_id):
+        """Per-question correctness over each player's final scored submission, or None."""
+        with self._lock:
+            finals = self._final_answers.get(game_id)
+            submissions = list(finals.values()) if finals else None
+        if not submissions:
+            return None
+        # Scored on demand: one columnar pass over at most max_players rows
+        result = answer_keys.score_batch(game_id, submissions)
+        return [{'position': position, 'correct': correct, 'answered': answered,
+                 'rate': correct / len(submissions)}
+                for position, (correct, answered) in enumerate(zip(result.correct, result.answered), 1)]
+
+    def close(self, game_id):
+        """Stop accepting submissions for a game that has been completed."""
+        with self._lock:
+            self._deadlines[game_id] = (datetime.datetime.now(datetime.timezone.utc),
+                                        time.monotonic() + self.deadline_ttl)
+
+    def evict(self, game_id):
+        """Forget everything held for a game that has left the hot tables."""
+        with self._lock:
+            self._deadlines.pop(game_id, None)
+            self._final_answers.pop(game_id, None)
+
+    def flush(self):
+        """Score and write every buffered submission, one batch and one transaction per game."""
+        with self._lock:
+            if time.monotonic() < self._retry_at:
+                return
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        by_game = {}
+        for entry in pending:
+            by_game.setdefault(entry[1], []).append(entry)
+
+        retry = []
+        for game_id, batch in by_game.items():
+            scores = [None] * len(batch)
+            try:
+                result = answer_keys.score_batch(game_id, [entry[3] for entry in batch])
+                scores = result.scores
+                # Later submissions from the same wallet win
+                submissions = {address: (ticket, score)
+                               for (ticket, _, address, _, _), score in zip(batch, scores)}
+                self._upsert_scores(game_id, submissions)
+                self._record_final_answers(game_id, batch)
+                status = 'flushed'
+            except Exception as e:
+                db.session.rollback()
+                attempts = max(entry[4] for entry in batch) + 1
+                if attempts < self.max_attempts:
+                    logger.warning(f"Error flushing submissions for game ID {game_id} "
+                                   f"(attempt {attempts} of {self.max_attempts}): {e}")
+                    retry.extend(entry[:4] + (attempts,) for entry in batch)
+                    status = 'pending'
+                else:
+                    logger.error(f"Giving up on {len(batch)} submissions for game ID {game_id}: {e}")
+                    self._dead_letter(batch, e)
+                    status = 'failed'
+            with self._flushed:
+                for (ticket, _, _, _, _), score in zip(batch, scores):
+                    if ticket in self._tickets:
+                        self._tickets[ticket] = (status, score)
+                self._flushed.notify_all()
+
+            if status == 'flushed':
+                emit_game_event('leaderboard_update', {
+                    'game_id': game_id,
+                    'scores': [{'player_address': address, 'score': score}
+                               for address, (_, score) in submissions.items()],
+                    'top': [{'player_address': entry.ethereum_address, 'score': entry.score}
+                            for entry in leaderboards.get(game_id).top(10)]
+                }, game_id)
+
+        if retry:
+            # Ahead of anything submitted since, so a wallet's later submission still wins;
+            # back off exponentially (1, 2, 4, ... seconds) so a short outage is ridden out
+            with self._lock:
+                self._pending[:0] = retry
+                self._retry_at = time.monotonic() + min(2 ** (max(entry[4] for entry in retry) - 1), 30)
+
+    def _dead_letter(self, batch, error):
+        try:
+            with open(self.dead_letter_path, 'a') as fp:
+                for ticket, game_id, ethereum_address, answers, attempts in batch:
+                    fp.write(json.dumps({'ticket': ticket, 'game_id': game_id, 'ethereum_address': ethereum_address,
+                                         'answers': answers, 'attempts': attempts + 1, 'error': str(error)}) + '\n')
+        except OSError as e:
+            # Last resort: the submissions themselves end up in the error log
+            logger.error(f"Could not write dead-letter file {self.dead_letter_path}: {e}; "
+                         f"lost submissions: {[entry[:4] for entry in batch]}")
+
+    def replay(self, path):
+        """Queue every submission in a dead-letter file again and flush; returns how many were queued.
+
+        The file is renamed first, so submissions that fail again start a new one.
+        """
+        if not os.path.exists(path):
+            return 0
+        replaying = f'{path}.replaying'
+        os.replace(path, replaying)
+        with open(replaying) as fp:
+            entries = [json.loads(line) for line in fp if line.strip()]
+        with self._lock:
+            for entry in entries:
+                self._pending.append((entry['ticket'], entry['game_id'], entry['ethereum_address'],
+                                      entry['answers'], 0))
+                self._tickets[entry['ticket']] = ('pending', None)
+        while self._pending:
+            self.flush()
+            time.sleep(self.flush_interval)
+        os.remove(replaying)
+        return len(entries)
+
+    def _record_final_answers(self, game_id, batch):
+        with self._lock:
+            finals = self._final_answers.setdefault(game_id, {})
+            # In submission order, so a wallet's later answers replace its earlier ones
+            for _, _, address, answers, _ in batch:
+                finals[address] = answers
+            self._final_answers.move_to_end(game_id)
+            while len(self._final_answers) > self.max_games:
+                self._final_answers.popitem(last=False)
+
+    def _upsert_scores(self, game_id, submissions):
+        addresses = list(submissions)
+        existing = {address for (address,) in db.session.query(Player.ethereum_address).filter(
+            Player.game_id == game_id, Player.ethereum_address.in_(addresses))}
+        now = datetime.datetime.now(datetime.timezone.utc)
+        rows = [{'game_id': game_id, 'ethereum_address': address, 'score': score, 'joined_at': now}
+                for address, (_, score) in submissions.items()]
+
+        dialect = db.engine.dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            insert = None
+
+        if insert is not None:
+            stmt = insert(Player.__table__).values(rows)
+            stmt = stmt.on_conflict_do_update(index_elements=['game_id', 'ethereum_address'],
+                                              set_={'score': stmt.excluded.score})
+            db.session.execute(stmt)
+        else:
+            for row in rows:
+                player = Player.query.filter_by(game_id=game_id, ethereum_address=row['ethereum_address']).first()
+                if player:
+                    player.score = row['score']
+                else:
+                    db.session.add(Player(**row))
+        db.session.commit()
+
+        for address, (_, score) in submissions.items():
+            leaderboards.record_score(game_id, address, score, now)
+        game_versions.bump(game_id)
+
+        new_players = len(addresses) - len(existing)
+        if new_players:
+            game_statistics.record_player_joined(new_players)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            with self.app.app_context():
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Error in submission queue: {e}")
+
+
+submission_queue = SubmissionQueue()
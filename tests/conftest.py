@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # create_app logs to ./error.log; keep that out of the checkout
+    monkeypatch.chdir(tmp_path)
+    from app import create_app
+    from extensions import db
+
+    app = create_app({'DATABASE_URL': f"sqlite:///{tmp_path / 'test.db'}", 'TESTING': True})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
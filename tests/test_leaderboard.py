@@ -0,0 +1,26 @@
+import datetime
+
+from extensions import db
+from leaderboard import leaderboards
+from models import Game, Player
+from utils import determine_winner
+
+
+def test_determine_winner_returns_the_player_row(app):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    game = Game(time_limit=60, max_players=10, pot_size=5, entry_value=1, start_time=now)
+    db.session.add(game)
+    db.session.commit()
+    assert determine_winner(game) is None
+
+    db.session.add_all([
+        Player(game_id=game.id, ethereum_address='0x' + '1' * 40, score=3, joined_at=now),
+        Player(game_id=game.id, ethereum_address='0x' + '2' * 40, score=5, joined_at=now),
+    ])
+    db.session.commit()
+    leaderboards.evict(game.id)  # Reload the board with both players
+
+    winner = determine_winner(game)
+    assert isinstance(winner, Player)
+    assert winner.ethereum_address == '0x' + '2' * 40
+    assert winner.game_id == game.id
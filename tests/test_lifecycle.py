@@ -0,0 +1,64 @@
+import datetime
+
+from extensions import db
+from lifecycle import GameLifecycleScheduler
+from models import Game
+
+
+def utcnow():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def add_game(**columns):
+    # Written straight to the table, as `flask import-games` or another worker would: schedule() never sees it
+    game = Game(time_limit=60, max_players=10, pot_size=1, entry_value=1, **columns)
+    db.session.add(game)
+    db.session.commit()
+    return game.id
+
+
+def make_scheduler(app):
+    scheduler = GameLifecycleScheduler()
+    scheduler.app = app
+    return scheduler
+
+
+def test_rescan_picks_up_games_inserted_elsewhere(app):
+    scheduler = make_scheduler(app)
+    assert scheduler.rescan() == 0
+
+    game_id = add_game(start_time=utcnow() - datetime.timedelta(seconds=1))
+    assert scheduler.rescan() == 1
+    assert scheduler.rescan() == 0  # Already queued at these times
+
+    scheduler._fire_due()
+    db.session.expire_all()
+    assert db.session.get(Game, game_id).has_started
+
+
+def test_rescan_requeues_games_retimed_elsewhere(app):
+    scheduler = make_scheduler(app)
+    game_id = add_game(start_time=utcnow() + datetime.timedelta(hours=1))
+    assert scheduler.rescan() == 1
+    scheduler._fire_due()
+    db.session.expire_all()
+    assert not db.session.get(Game, game_id).has_started
+
+    Game.query.filter_by(id=game_id).update({'start_time': utcnow() - datetime.timedelta(seconds=1)})
+    db.session.commit()
+    assert scheduler.rescan() == 1
+
+    scheduler._fire_due()
+    db.session.expire_all()
+    assert db.session.get(Game, game_id).has_started
+
+
+def test_rescan_forgets_games_completed_elsewhere(app):
+    scheduler = make_scheduler(app)
+    game_id = add_game(start_time=utcnow() + datetime.timedelta(hours=1))
+    scheduler.rescan()
+
+    Game.query.filter_by(id=game_id).update({'is_complete': True})
+    db.session.commit()
+    scheduler.rescan()
+    assert game_id not in scheduler._scheduled
@@ -0,0 +1,18 @@
+import datetime
+
+import pytest
+
+from extensions import db
+from models import Game
+
+
+@pytest.mark.parametrize('body', ['[]', '"0x1111111111111111111111111111111111111111"', '5', 'null', '{}', 'not json'])
+def test_join_without_an_address_object_is_rejected(app, body):
+    game = Game(time_limit=60, max_players=10, pot_size=5, entry_value=1,
+                start_time=datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1))
+    db.session.add(game)
+    db.session.commit()
+
+    response = app.test_client().post(f'/game/{game.id}/lobby', data=body, content_type='application/json')
+    assert response.status_code == 400
+    assert response.get_json() == {'success': False, 'message': 'Ethereum address is required.'}
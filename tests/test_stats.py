@@ -0,0 +1,30 @@
+import datetime
+
+from extensions import db
+from models import Game, Player
+from stats import GameStatistics
+
+
+def test_reconcile_keeps_joins_recorded_during_its_queries(app):
+    game = Game(time_limit=60, max_players=10, pot_size=5, entry_value=1,
+                start_time=datetime.datetime.now(datetime.timezone.utc))
+    db.session.add(game)
+    db.session.commit()
+    db.session.add(Player(game_id=game.id, ethereum_address='0x' + '1' * 40, score=0))
+    db.session.commit()
+
+    stats = GameStatistics()
+    query_totals = stats._query_totals
+
+    def join_while_querying():
+        # A second player commits and is recorded after the snapshot was read
+        totals = query_totals()
+        db.session.add(Player(game_id=game.id, ethereum_address='0x' + '2' * 40, score=0))
+        db.session.commit()
+        stats.record_player_joined()
+        return totals
+
+    stats._query_totals = join_while_querying
+    stats.reconcile()
+    assert stats.snapshot()['total_players'] == 2
+    assert stats.snapshot()['total_games'] == 1
@@ -1,43 +1,34 @@
-from models import Game, Player
-from sqlalchemy import func
-from extensions import db
-import pytz
-from datetime import datetime
+from models import Player
+from stats import game_statistics
+from answers import normalize_answer, score_answers
+from leaderboard import leaderboards
+from logging import getLogger
+
+
+# Initialize logger
+logger = getLogger(__name__)
 
 def check_answers(questions, submitted_answers):
-    score = 0
-    for question, answer in zip(questions, submitted_answers):
-        if question.answer.lower() == answer.lower():
-            score += 1
-    return score
+    # Same normalization as the cached answer keys used by the game routes
+    answer_key = [normalize_answer(question.answer) for question in questions]
+    return score_answers(answer_key, submitted_answers)
 
 def determine_winner(game):
-    players = Player.query.filter_by(game_id=game.id).order_by(Player.score.desc()).all()
-    if players:
-        return players[0]
-    return None
+    """Return the game's winning Player, or None if nobody joined.
+
+    Ranked by the in-memory leaderboard, so only the winner's row is loaded.
+    """
+    entry = leaderboards.get(game.id).winner()
+    if entry is None:
+        return None
+    return Player.query.filter_by(game_id=game.id, ethereum_address=entry.ethereum_address).first()
 
 def calculate_game_statistics():
+    # Served from the in-memory running totals; see stats.GameStatistics
     try:
-        total_games = Game.query.count()
-        total_rewards = db.session.query(func.sum(Game.pot_size)).scalar() or 0
-        total_players = Player.query.count()
-        completed_games = Game.query.filter_by(is_complete=True)
-        completed_games_count = completed_games.count()
-        total_time = completed_games.with_entities(func.sum(Game.time_limit)).scalar() or 0
-        avg_time_per_game = total_time / completed_games_count if completed_games_count > 0 else 0
-        avg_earnings_per_winner = total_rewards / completed_games_count if completed_games_count > 0 else 0
-
-        return {
-            'total_games': total_games,
-            'total_rewards': total_rewards,
-            'total_players': total_players,
-            'total_time': total_time,
-            'avg_time_per_game': avg_time_per_game,
-            'avg_earnings_per_winner': avg_earnings_per_winner
-        }
+        return game_statistics.snapshot()
     except Exception as e:
-        print(f"Error calculating game statistics: {e}")
+        logger.error(f"Error calculating game statistics: {e}")
         return {
             'total_games': 0,
             'total_rewards': 0,
@@ -46,10 +37,3 @@ def calculate_game_statistics():
             'avg_time_per_game': 0,
             'avg_earnings_per_winner': 0
         }
-
-def make_aware(dt):
-    if dt is None:
-        return None
-    if dt.tzinfo is None:
-        return pytz.utc.localize(dt)
-    return dt
@@ -0,0 +1,31 @@
+import threading
+
+
+class GameVersions:
+    """Monotonic version counters for cached game data.
+
+    Every write path that changes what a client would see (game created,
+    started or completed, player joined, scores flushed) bumps the game's
+    counter and the global counter; caches key their entries on these.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._global = 0
+        self._games = {}
+
+    def bump(self, game_id=None):
+        with self._lock:
+            self._global += 1
+            if game_id is not None:
+                self._games[game_id] = self._games.get(game_id, 0) + 1
+
+    def game(self, game_id):
+        return self._games.get(game_id, 0)
+
+    @property
+    def current(self):
+        return self._global
+
+
+game_versions = GameVersions()
@@ -1,42 +1,125 @@
-from flask_socketio import emit
-from models import Game, Player
+from flask_socketio import emit, join_room, leave_room
+from models import Game
 from extensions import db, socketio
-from datetime import datetime, timedelta, timezone  # Correct
-from sqlalchemy import func
-from utils import make_aware  # Correct import
-import pytz
+from datetime import datetime, timezone
+from ratelimit import rate_limiter, SOCKET_JOIN
+from addresses import ethereum_addresses
 
 
-def calculate_game_statistics():
+# Game phases pushed to clients, in order
+LOBBY, PLAY, RESULTS = 'lobby', 'play', 'results'
+
+# Clients spread a phase transition over a window sized to the game's player
+# count so they don't all request the next page in the same instant
+TRANSITION_SPREAD_PER_PLAYER_MS = 10
+TRANSITION_SPREAD_MIN_MS = 250
+TRANSITION_SPREAD_MAX_MS = 5000
+
+# Socket.IO rooms on the /game namespace: one room per game plus a lightweight
+# room for clients watching the homepage game listing.
+LOBBY_ROOM = 'lobby'
+
+
+def game_room(game_id):
+    return f'game_{game_id}'
+
+
+def emit_game_event(event, data, game_id, lobby=False):
+    """Emit an event only to sockets in the game's room (and the listing room if asked)."""
+    socketio.emit(event, data, to=game_room(game_id), namespace='/game')
+    if lobby:
+        socketio.emit(event, data, to=LOBBY_ROOM, namespace='/game')
+
+
+def _epoch_ms(dt):
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def game_phase(game, now=None):
+    now = now or datetime.now(timezone.utc)
+    if game.is_complete:
+        return RESULTS
+    if game.has_started or (game.start_time is not None and game.start_time <= now):
+        return PLAY
+    return LOBBY
+
+
+def clock_payload(game, phase=None):
+    """The server's clock plus the game's phase and boundaries, as epoch milliseconds."""
+    now = datetime.now(timezone.utc)
+    return {
+        'game_id': game.id,
+        'phase': phase or game_phase(game, now),
+        'server_time': _epoch_ms(now),
+        'start_time': _epoch_ms(game.start_time),
+        'end_time': _epoch_ms(game.end_time),
+    }
+
+
+def transition_spread_ms(player_count):
+    return min(TRANSITION_SPREAD_MAX_MS, max(TRANSITION_SPREAD_MIN_MS, player_count * TRANSITION_SPREAD_PER_PLAYER_MS))
+
+
+def emit_clock_sync(game):
+    socketio.emit('clock_sync', clock_payload(game), to=game_room(game.id), namespace='/game')
+
+
+def emit_phase_change(game, phase, player_count=0):
+    """Tell a game room to move to the next page; each client waits a random delay within spread_ms."""
+    payload = clock_payload(game, phase)
+    payload['spread_ms'] = transition_spread_ms(player_count)
+    emit_game_event('phase_change', payload, game.id)
+
+
+def _game_id_from(data):
+    # Clients can send any JSON value as the payload, not only an object
+    if not isinstance(data, dict):
+        return None
     try:
-        total_games = Game.query.count()
-        total_rewards = db.session.query(func.sum(Game.pot_size)).scalar() or 0
-        total_players = Player.query.count()
-
-        completed_games = Game.query.filter_by(is_complete=True)
-        completed_games_count = completed_games.count()
-
-        total_time = completed_games.with_entities(func.sum(Game.time_limit)).scalar() or 0
-        avg_time_per_game = total_time / completed_games_count if completed_games_count > 0 else 0
-
-        avg_earnings_per_winner = total_rewards / completed_games_count if completed_games_count > 0 else 0
-
-        return {
-            'total_games': total_games,
-            'total_rewards': total_rewards,
-            'total_players': total_players,
-            'total_time': total_time,
-            'avg_time_per_game': avg_time_per_game,
-            'avg_earnings_per_winner': avg_earnings_per_winner
-        }
-
-    except Exception as e:
-        print(f"Error calculating game statistics: {e}")
-        return {
-            'total_games': 0,
-            'total_rewards': 0,
-            'total_players': 0,
-            'total_time': 0,
-            'avg_time_per_game': 0,
-            'avg_earnings_per_winner': 0
-        }
+        return int(data.get('game_id'))
+    except (TypeError, ValueError):
+        return None
+
+
+@socketio.on('join', namespace='/game')
+def on_join(data):
+    game_id = _game_id_from(data)
+    if game_id is not None:
+        # Rejected before the room join and the game lookup
+        wallet = ethereum_addresses.canonical(data.get('ethereum_address'))  # data is a dict here
+        decision = rate_limiter.check(SOCKET_JOIN, wallet=wallet, ip=rate_limiter.client_ip(), game_id=game_id)
+        if not decision.allowed:
+            emit('rate_limited', {'game_id': game_id, 'retry_after': round(decision.retry_after, 3)})
+            return
+        join_room(game_room(game_id))
+        # Give the new client the authoritative clock and phase straight away
+        game = db.session.get(Game, game_id)
+        if game is not None:
+            emit('clock_sync', clock_payload(game))
+
+
+@socketio.on('leave', namespace='/game')
+def on_leave(data):
+    game_id = _game_id_from(data)
+    if game_id is not None:
+        leave_room(game_room(game_id))
+
+
+@socketio.on('clock_sync', namespace='/game')
+def on_clock_sync(data=None):
+    # Acknowledged with the server time so the client can correct for round-trip latency
+    return {'server_time': _epoch_ms(datetime.now(timezone.utc))}
+
+
+@socketio.on('join_lobby', namespace='/game')
+def on_join_lobby(data=None):
+    join_room(LOBBY_ROOM)
+
+
+@socketio.on('leave_lobby', namespace='/game')
+def on_leave_lobby(data=None):
+    leave_room(LOBBY_ROOM)
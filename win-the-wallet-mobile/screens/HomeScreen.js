@@ -73,7 +73,7 @@ export default function HomeScreen({ navigation }) {
     >
       <Text style={styles.gameTitle}>Game #{item.id}</Text>
       <Text>Pot Size: ${item.pot_size.toFixed(2)}</Text>
-      <Text>Players: {item.players.length} / {item.max_players}</Text>
+      <Text>Players: {item.player_count} / {item.max_players}</Text>
       <Text>Start Time: {formatDateTime(item.start_time)}</Text>
       <Text>Status: {getGameStatus(item)}</Text>
     </TouchableOpacity>